@@ -10,9 +10,35 @@ st.set_page_config(
 
 
 import streamlit as st
+import numpy as np
 import pandas as pd
-from utils.charts import create_risk_gauge, COLORS
-from utils.calculations import simulate_credit_risk, format_currency
+from utils.charts import create_risk_gauge, create_score_surface, COLORS
+from utils.calculations import (simulate_credit_risk, simulate_credit_risk_batch, simulate_score_surface,
+                                format_currency, THRESHOLD_MODELO)
+from utils.cache import ScoreCache
+
+
+@st.cache_resource
+def get_score_cache():
+    # Compartilhado entre sessões: reenvios do mesmo perfil não recalculam o score
+    return ScoreCache(max_entries=10_000, ttl_seconds=3600)
+
+
+def simulate_credit_risk_cached(**perfil):
+    return get_score_cache().get_or_compute(perfil, lambda: simulate_credit_risk(**perfil))
+
+
+# Pontos por eixo da superfície what-if (mesmos limites do formulário)
+SURFACE_POINTS = 500
+
+
+@st.cache_data
+def get_score_surface(idade, historico_credito, finalidade_emprestimo):
+    # Uma superfície por combinação das entradas fixas
+    rendas = np.linspace(1000, 50000, SURFACE_POINTS)
+    valores = np.linspace(1000, 500000, SURFACE_POINTS)
+    scores = simulate_score_surface(idade, historico_credito, finalidade_emprestimo, rendas, valores)
+    return rendas, valores, scores
 
 
 st.markdown('<h2 class="section-header">🔍 Simulador de Risco de Crédito Individual</h2>', 
@@ -104,7 +130,7 @@ with st.form("risk_analysis_form"):
 # Resultados da análise
 if analisar:
     # Executando simulação
-    resultado = simulate_credit_risk(
+    resultado = simulate_credit_risk_cached(
         idade=idade,
         renda_mensal=renda_mensal,
         valor_emprestimo=valor_emprestimo,
@@ -287,6 +313,20 @@ if analisar:
             - Incluir avalista ou garantia real
             """)
     
+    # Superfície what-if: mesmas entradas fixas, renda e valor variando
+    st.markdown("---")
+    st.markdown("### 🗺️ Superfície What-If")
+    
+    rendas, valores, scores = get_score_surface(idade, historico_credito, finalidade_emprestimo)
+    fig_surface = create_score_surface(rendas, valores, scores, THRESHOLD_MODELO,
+                                       renda_mensal, valor_emprestimo)
+    st.plotly_chart(fig_surface, use_container_width=True)
+    
+    aprovados = scores <= THRESHOLD_MODELO
+    st.caption(f"{aprovados.mean():.1%} das combinações de renda e valor são aprovadas para este perfil. "
+               "A linha branca marca a fronteira de aprovação (score = threshold); use-a para "
+               "estruturar contrapropostas de valor ou exigência de renda.")
+    
     # Comparação com outros perfis
     st.markdown("---")
     st.markdown("### 📊 Comparação com Outros Perfis")
@@ -319,15 +359,19 @@ if analisar:
         }
     ]
     
+    # Todos os perfis de comparação escorados em uma única chamada vetorizada
+    df_perfis = pd.DataFrame(perfis_comparacao)
+    resultados_batch = simulate_credit_risk_batch(
+        df_perfis.rename(columns={
+            'renda': 'renda_mensal',
+            'valor': 'valor_emprestimo',
+            'historico': 'historico_credito',
+            'finalidade': 'finalidade_emprestimo'
+        })
+    )
+    
     resultados_comparacao = []
-    for perfil in perfis_comparacao:
-        resultado_comp = simulate_credit_risk(
-            idade=perfil['idade'],
-            renda_mensal=perfil['renda'],
-            valor_emprestimo=perfil['valor'],
-            historico_credito=perfil['historico'],
-            finalidade_emprestimo=perfil['finalidade']
-        )
+    for perfil, resultado_comp in zip(perfis_comparacao, resultados_batch.to_dict('records')):
         resultados_comparacao.append({
             'Perfil': perfil['nome'],
             'Score': f"{resultado_comp['score']:.3f}",
@@ -1,17 +1,42 @@
 
+import os
+
 import streamlit as st
 import plotly.graph_objects as go
-from utils.data_loader import load_business_metrics, generate_sample_portfolio
-from utils.charts import create_portfolio_distribution, COLORS
+from utils.data_loader import load_business_metrics
+from utils.portfolio_analytics import summarize_portfolio_lazy
+from utils.portfolio_store import (PORTFOLIO_STORE_PATH, build_sample_store, load_store_kpis,
+                                   store_partition_values, store_version)
+from utils.charts import (create_portfolio_distribution, create_distribution_histogram,
+                          create_portfolio_scatter, COLORS)
 from utils.calculations import format_currency, format_percentage
 
 
+# Tamanhos de carteira disponíveis no seletor
+PORTFOLIO_SIZES = [1_000, 100_000, 1_000_000, 10_000_000]
+
+
+@st.cache_resource
+def get_portfolio_store(n_samples):
+    # Carteira sintética gravada uma vez por tamanho e reaproveitada entre sessões
+    path = f"{PORTFOLIO_STORE_PATH}_{n_samples}"
+    if not os.path.exists(path):
+        build_sample_store(n_samples, path)
+    return path
+
+
+@st.cache_data
+def get_portfolio_summary(path, faixas, meses, versao):
+    # Consultas Polars em streaming sobre as partições; só o resumo chega aos gráficos.
+    # versao (store_version) entra na chave: lotes acrescentados à carteira invalidam o resumo
+    return summarize_portfolio_lazy(path, faixas, meses)
+
+
 st.markdown('<h2 class="section-header">📊 Dashboard de Performance e Impacto</h2>', 
             unsafe_allow_html=True)
 
 # Carregando dados
 kpis = load_business_metrics()
-portfolio = generate_sample_portfolio()
 
 # KPIs principais em colunas
 col1, col2, col3, col4 = st.columns(4)
@@ -50,18 +75,61 @@ with col4:
 
 st.markdown("---")
 
+# Carteira: tamanho e filtros (aplicados na leitura das partições)
+st.markdown("### 🗂️ Carteira")
+
+n_clientes = st.select_slider(
+    "Tamanho da carteira simulada",
+    options=PORTFOLIO_SIZES,
+    value=PORTFOLIO_SIZES[0],
+    format_func=lambda n: f"{n:,}".replace(",", "."),
+    help="Os gráficos usam dados pré-agregados, então o custo no navegador não depende do tamanho"
+)
+caminho_carteira = get_portfolio_store(n_clientes)
+particoes = store_partition_values(caminho_carteira)
+
+# KPIs da carteira completa, mantidos incrementalmente (leitura de um arquivo pequeno)
+kpis_carteira = load_store_kpis(caminho_carteira)
+score_p50, score_p95 = kpis_carteira.quantile([0.5, 0.95])
+
+col1, col2, col3, col4 = st.columns(4)
+col1.metric("👥 Clientes", f"{kpis_carteira.n_rows:,}".replace(",", "."))
+col2.metric("💵 Exposição Total", format_currency(kpis_carteira.total('loan_amount')))
+col3.metric("📍 Score Mediano", f"{score_p50:.3f}")
+col4.metric("⚠️ Score P95", f"{score_p95:.3f}", help="95% da carteira tem score de risco abaixo deste valor")
+
+col1, col2 = st.columns(2)
+
+with col1:
+    faixas = st.multiselect(
+        "Faixas de risco",
+        particoes['risk_category'],
+        default=particoes['risk_category']
+    )
+
+with col2:
+    mes_inicial, mes_final = st.select_slider(
+        "Mês de originação",
+        options=particoes['origination_month'],
+        value=(particoes['origination_month'][0], particoes['origination_month'][-1])
+    )
+
+meses = [mes for mes in particoes['origination_month'] if mes_inicial <= mes <= mes_final]
+resumo = get_portfolio_summary(caminho_carteira, tuple(faixas), tuple(meses),
+                               store_version(caminho_carteira))
+
 # Seção de análise da carteira
 col1, col2 = st.columns([1, 1])
 
 with col1:
     st.markdown("### 📊 Distribuição de Risco da Carteira")
-    fig_portfolio = create_portfolio_distribution(portfolio)
+    fig_portfolio = create_portfolio_distribution(resumo['risk_category'])
     st.plotly_chart(fig_portfolio, use_container_width=True)
     
-    # Insights da distribuição
-    risk_counts = portfolio['risk_category'].value_counts()
-    baixo_risco_pct = (risk_counts.get('Baixo Risco', 0) / len(portfolio)) * 100
-    alto_risco_pct = (risk_counts.get('Alto Risco', 0) / len(portfolio)) * 100
+    # Insights da carteira completa, a partir dos KPIs incrementais
+    risk_share = kpis_carteira.summary().set_index('category')['share']
+    baixo_risco_pct = risk_share.get('Baixo Risco', 0) * 100
+    alto_risco_pct = risk_share.get('Alto Risco', 0) * 100
     
     st.info(f"""
     **Insights da Carteira:**
@@ -125,6 +193,58 @@ with col2:
 
 st.markdown("---")
 
+# Distribuições da carteira (a partir dos resumos)
+st.markdown("### 📉 Distribuições da Carteira")
+
+col1, col2, col3 = st.columns(3)
+
+with col1:
+    st.plotly_chart(create_distribution_histogram(resumo['risk_score'], 'Score de Risco', 'Score',
+                                                  COLORS['primary'], '.0%'),
+                    use_container_width=True)
+
+with col2:
+    st.plotly_chart(create_distribution_histogram(resumo['loan_amount'], 'Valor do Empréstimo',
+                                                  'Valor (R$)', COLORS['light_blue'], ',.0f'),
+                    use_container_width=True)
+
+with col3:
+    st.plotly_chart(create_distribution_histogram(resumo['monthly_income'], 'Renda Mensal',
+                                                  'Renda (R$)', COLORS['success'], ',.0f'),
+                    use_container_width=True)
+
+st.plotly_chart(create_portfolio_scatter(resumo['sample']), use_container_width=True)
+
+# Exposição por faixa e estatísticas dos valores (seleção atual)
+col1, col2 = st.columns([3, 2])
+
+with col1:
+    st.markdown("#### 💼 Exposição por Faixa de Risco")
+    exposicao = resumo['exposure']
+    st.dataframe(
+        exposicao.assign(
+            share=(exposicao['share'] * 100).map(format_percentage),
+            exposure=exposicao['exposure'].map(format_currency),
+            mean_loan=exposicao['mean_loan'].map(format_currency, na_action='ignore'),
+            mean_income=exposicao['mean_income'].map(format_currency, na_action='ignore')
+        ).rename(columns={
+            'category': 'Faixa', 'count': 'Clientes', 'share': 'Participação', 'exposure': 'Exposição',
+            'mean_score': 'Score Médio', 'mean_loan': 'Empréstimo Médio', 'mean_income': 'Renda Média'
+        }),
+        hide_index=True,
+        use_container_width=True
+    )
+
+with col2:
+    st.markdown("#### 📐 Estatísticas dos Valores")
+    estatisticas = resumo['statistics'].set_index('column').rename(
+        index={'loan_amount': 'Empréstimo', 'monthly_income': 'Renda Mensal'},
+        columns={'mean': 'Média', 'std': 'Desvio Padrão', 'min': 'Mínimo', 'max': 'Máximo'}
+    )
+    st.dataframe(estatisticas.style.format(format_currency, na_rep='-'), use_container_width=True)
+
+st.markdown("---")
+
 # Seção de comparação de modelos
 st.markdown("### 📈 Comparação de Performance")
 
@@ -4,12 +4,17 @@ import pandas as pd
 from utils.data_loader import load_feature_importance
 from utils.charts import create_feature_importance, COLORS
 
+# Variáveis exibidas no gráfico e por categoria
+TOP_N = 10
+TOP_PER_CATEGORY = 5
+
 
 st.markdown('<h2 class="section-header">📈 Análise de Variáveis Importantes</h2>', 
             unsafe_allow_html=True)
 
-# Carregando dados das features
+# Importâncias extraídas do modelo (cache em disco por hash do arquivo)
 features_df = load_feature_importance()
+top_features = features_df.head(TOP_N)
 
 # Gráfico de importância
 st.markdown("### 🎯 Top 10 Variáveis Mais Importantes")
@@ -17,17 +22,17 @@ st.markdown("### 🎯 Top 10 Variáveis Mais Importantes")
 col1, col2 = st.columns([3, 1])
 
 with col1:
-    fig_importance = create_feature_importance(features_df)
+    fig_importance = create_feature_importance(features_df, TOP_N)
     st.plotly_chart(fig_importance, use_container_width=True)
 
 with col2:
     st.markdown("#### 📊 Distribuição por Categoria")
     
     # Contagem por categoria
-    category_counts = features_df['Category'].value_counts()
+    category_counts = top_features['Category'].value_counts()
     
     for category, count in category_counts.items():
-        percentage = (count / len(features_df)) * 100
+        percentage = (count / len(top_features)) * 100
         st.markdown(f"**{category}:** {count} ({percentage:.0f}%)")
     
     st.info("""
@@ -43,7 +48,7 @@ st.markdown("### 🔍 Análise Detalhada por Categoria")
 
 # Histórico de Pagamento
 with st.expander("💳 1. Histórico de Pagamento (Mais Importante)", expanded=True):
-    hist_vars = features_df[features_df['Category'] == 'Histórico Pagamento']
+    hist_vars = features_df[features_df['Category'] == 'Histórico Pagamento'].head(TOP_PER_CATEGORY)
     
     col1, col2 = st.columns(2)
     
@@ -68,7 +73,7 @@ with st.expander("💳 1. Histórico de Pagamento (Mais Importante)", expanded=T
 
 # Capacidade de Pagamento  
 with st.expander("💰 2. Capacidade de Pagamento"):
-    cap_vars = features_df[features_df['Category'] == 'Capacidade Pagamento']
+    cap_vars = features_df[features_df['Category'] == 'Capacidade Pagamento'].head(TOP_PER_CATEGORY)
     
     col1, col2 = st.columns(2)
     
@@ -93,7 +98,7 @@ with st.expander("💰 2. Capacidade de Pagamento"):
 
 # Utilização de Crédito
 with st.expander("📊 3. Utilização de Crédito"):
-    cred_vars = features_df[features_df['Category'] == 'Utilização Crédito']
+    cred_vars = features_df[features_df['Category'] == 'Utilização Crédito'].head(TOP_PER_CATEGORY)
     
     col1, col2 = st.columns(2)
     
@@ -113,7 +118,7 @@ with st.expander("📊 3. Utilização de Crédito"):
 
 # Score Externo
 with st.expander("🎯 4. Score Externo"):
-    score_vars = features_df[features_df['Category'] == 'Score Externo']
+    score_vars = features_df[features_df['Category'] == 'Score Externo'].head(TOP_PER_CATEGORY)
     
     col1, col2 = st.columns(2)
     
@@ -136,29 +141,44 @@ with st.expander("🎯 4. Score Externo"):
     96.47% de valores ausentes nesta variável. Necessário melhorar integração com bureaus de crédito.
     """)
 
-# Consultas Recentes
-with st.expander("🔍 5. Consultas Recentes"):
-    cons_vars = features_df[features_df['Category'] == 'Consultas Recentes']
+# Datas e Recência
+with st.expander("📅 5. Datas e Recência"):
+    date_vars = features_df[features_df['Category'] == 'Datas e Recência'].head(TOP_PER_CATEGORY)
     
-    st.markdown("**💡 Insights de Negócio:**")
-    st.markdown("""
-    - Múltiplas consultas indicam desespero por crédito
-    - Aplicações recentes são sinal de alerta
-    - Comportamento de "shopping" de crédito
-    - Correlação com deterioração financeira
-    """)
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown("**Variáveis Identificadas:**")
+        for _, row in date_vars.iterrows():
+            st.markdown(f"- **{row['Variable']}:** {row['Description']}")
+    
+    with col2:
+        st.markdown("**💡 Insights de Negócio:**")
+        st.markdown("""
+        - Aprovações recentes indicam busca ativa por crédito
+        - Recência complementa o histórico de pagamento
+        - Sazonalidade da data pode refletir ciclos de renda
+        """)
 
 # Dados Demográficos
 with st.expander("👥 6. Dados Demográficos"):
-    demo_vars = features_df[features_df['Category'] == 'Dados Demográficos']
+    demo_vars = features_df[features_df['Category'] == 'Dados Demográficos'].head(TOP_PER_CATEGORY)
     
-    st.markdown("**💡 Insights de Negócio:**")
-    st.markdown("""
-    - Escolaridade impacta na gestão financeira
-    - Perfil demográfico influencia risco
-    - Variáveis de suporte para decisão
-    - Menor poder preditivo individual
-    """)
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown("**Variáveis Identificadas:**")
+        for _, row in demo_vars.iterrows():
+            st.markdown(f"- **{row['Variable']}:** {row['Description']}")
+    
+    with col2:
+        st.markdown("**💡 Insights de Negócio:**")
+        st.markdown("""
+        - Escolaridade impacta na gestão financeira
+        - Perfil demográfico influencia risco
+        - Variáveis de suporte para decisão
+        - Menor poder preditivo individual
+        """)
 
 st.markdown("---")
 
@@ -0,0 +1,191 @@
+import os
+import tempfile
+import time
+
+import streamlit as st
+from utils.bulk_scoring import (RULE_COLUMNS, CHUNK_ROWS, ChunkedWriter, csv_column_types, iter_batches,
+                                read_columns, score_chunk)
+from utils.calculations import THRESHOLD_MODELO, format_percentage
+from utils.scoring import ID_COLUMNS, load_model
+
+
+MOTOR_REGRAS = "Motor de regras (simulador)"
+MOTOR_MODELO = "Modelo LightGBM + SMOTE"
+
+
+@st.cache_resource
+def get_model():
+    return load_model()
+
+
+def cancelar_escoragem():
+    st.session_state['lote_cancelado'] = True
+
+
+def leitor_resultado(path):
+    # Lido apenas no clique do download, sem guardar o arquivo na memória da sessão a cada rerun
+    def ler():
+        with open(path, 'rb') as resultado:
+            return resultado.read()
+    return ler
+
+
+def remover_saida_anterior():
+    # Mantém no disco apenas o resultado mais recente da sessão
+    saida = st.session_state.pop('lote_saida', None)
+    if saida and os.path.exists(saida['path']):
+        os.remove(saida['path'])
+
+
+st.markdown('<h2 class="section-header">📥 Escoragem de Solicitantes em Lote</h2>',
+            unsafe_allow_html=True)
+
+st.markdown("""
+**Envie um arquivo CSV ou Parquet com os solicitantes e receba o arquivo escorado.**
+O arquivo é lido e escorado em lotes, e cada lote é gravado em disco assim que termina,
+então o tamanho do arquivo não é limitado pela memória da aplicação.
+""")
+
+st.markdown("---")
+
+# Arquivo de entrada
+st.markdown("### 📁 Arquivo de Solicitantes")
+
+arquivo = st.file_uploader(
+    "Selecione o arquivo",
+    type=['csv', 'parquet'],
+    help="Motor de regras: colunas " + ", ".join(RULE_COLUMNS) +
+         ". Modelo: as features de notebook/train_model_um.parquet."
+)
+
+if st.session_state.pop('lote_cancelado', False):
+    remover_saida_anterior()
+    st.warning("⏹️ Escoragem cancelada. O arquivo parcial foi descartado.")
+
+if arquivo is not None:
+    colunas = read_columns(arquivo, arquivo.name)
+    modelo = get_model()
+
+    # Motores disponíveis de acordo com as colunas do arquivo
+    motores = []
+    if all(col in colunas for col in RULE_COLUMNS):
+        motores.append(MOTOR_REGRAS)
+    if all(col in colunas for col in modelo.feature_name_):
+        motores.append(MOTOR_MODELO)
+
+    if not motores:
+        st.error("O arquivo não tem as colunas de nenhum dos motores. Motor de regras: " +
+                 ", ".join(RULE_COLUMNS) + ". Modelo: features de notebook/train_model_um.parquet.")
+        st.stop()
+
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        motores_selecionados = st.multiselect(
+            "Motores de escoragem",
+            motores,
+            default=motores,
+            help="Apenas motores cujas colunas estão presentes no arquivo"
+        )
+
+    with col2:
+        linhas_por_lote = st.number_input(
+            "Linhas por lote",
+            min_value=1_000,
+            max_value=1_000_000,
+            value=CHUNK_ROWS,
+            step=10_000,
+            help="Lotes maiores aumentam a vazão e o uso de memória"
+        )
+
+    with col3:
+        formato_saida = st.radio("Formato de saída", ["Parquet", "CSV"], horizontal=True)
+
+    iniciar = st.button(
+        "▶️ Iniciar Escoragem",
+        use_container_width=True,
+        type="primary",
+        disabled=not motores_selecionados
+    )
+
+    if iniciar:
+        remover_saida_anterior()
+        usar_regras = MOTOR_REGRAS in motores_selecionados
+        usar_modelo = MOTOR_MODELO in motores_selecionados
+
+        # Apenas as colunas usadas pelos motores selecionados são lidas do Parquet
+        colunas_lidas = [col for col in ID_COLUMNS if col in colunas]
+        if usar_regras:
+            colunas_lidas += RULE_COLUMNS
+        if usar_modelo:
+            colunas_lidas += [col for col in modelo.feature_name_ if col not in colunas_lidas]
+
+        tipos_csv = csv_column_types(modelo if usar_modelo else None)
+
+        extensao = '.parquet' if formato_saida == "Parquet" else '.csv'
+        descritor, caminho_saida = tempfile.mkstemp(prefix='escoragem_', suffix=extensao)
+        os.close(descritor)
+
+        # Qualquer clique reinicia o script e interrompe o laço; o callback marca o cancelamento
+        botao_cancelar = st.empty()
+        botao_cancelar.button("⏹️ Cancelar", on_click=cancelar_escoragem)
+        barra = st.progress(0.0, text="Iniciando...")
+        col1, col2, col3 = st.columns(3)
+        metrica_linhas = col1.empty()
+        metrica_vazao = col2.empty()
+        metrica_aprovacao = col3.empty()
+
+        inicio = time.perf_counter()
+        aprovados = 0
+        concluido = False
+        try:
+            with ChunkedWriter(caminho_saida, formato_saida.lower()) as writer:
+                for lote, fracao in iter_batches(arquivo, arquivo.name, linhas_por_lote, colunas_lidas, tipos_csv):
+                    escorado = score_chunk(lote, writer.rows, usar_regras,
+                                           modelo if usar_modelo else None, THRESHOLD_MODELO)
+                    writer.write(escorado)
+
+                    coluna_decisao = 'modelo_aprovado' if usar_modelo else 'regra_aprovado'
+                    aprovados += int(escorado[coluna_decisao].sum())
+                    decorrido = time.perf_counter() - inicio
+
+                    barra.progress(fracao, text=f"{fracao:.0%} do arquivo processado")
+                    metrica_linhas.metric("Linhas Escoradas", f"{writer.rows:,}".replace(",", "."))
+                    metrica_vazao.metric("Vazão", f"{writer.rows / decorrido:,.0f} linhas/s".replace(",", "."))
+                    metrica_aprovacao.metric("Taxa de Aprovação",
+                                             format_percentage(aprovados / writer.rows * 100))
+            concluido = True
+        finally:
+            # Cancelamento (rerun) interrompe o laço: o arquivo parcial é descartado
+            if not concluido and os.path.exists(caminho_saida):
+                os.remove(caminho_saida)
+
+        botao_cancelar.empty()
+        barra.progress(1.0, text="Concluído")
+        st.session_state['lote_saida'] = {
+            'path': caminho_saida,
+            'nome': os.path.splitext(arquivo.name)[0] + '_escorado' + extensao,
+            'linhas': writer.rows,
+            'segundos': time.perf_counter() - inicio
+        }
+
+# Download do resultado mais recente
+saida = st.session_state.get('lote_saida')
+if saida and os.path.exists(saida['path']):
+    st.markdown("---")
+    st.markdown("### ✅ Resultado")
+    st.success(f"{saida['linhas']:,} linhas escoradas em {saida['segundos']:.1f}s.".replace(",", "."))
+
+    st.download_button(
+        "⬇️ Baixar Arquivo Escorado",
+        data=leitor_resultado(saida['path']),
+        file_name=saida['nome'],
+        mime='application/octet-stream',
+        use_container_width=True
+    )
+
+from utils.assets import custom_assets
+custom_assets()
+
+from utils.developer import rodape_desenvolvedor
+rodape_desenvolvedor()
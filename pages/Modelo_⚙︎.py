@@ -1,9 +1,45 @@
 
+import numpy as np
 import streamlit as st
 import pandas as pd
-from utils.data_loader import load_model_data, load_confusion_matrix_data
-from utils.charts import create_auc_comparison, create_confusion_matrix, create_roc_curve, COLORS
-from utils.calculations import calculate_model_metrics, format_percentage
+from utils.data_loader import load_model_data, load_confusion_matrix_data, load_test_scores
+from utils.charts import (create_auc_comparison, create_confusion_matrix, create_roc_curve, create_pr_curve,
+                          create_profit_curve, COLORS)
+from utils.calculations import (calculate_model_metrics, calculate_roi, format_currency, format_percentage,
+                                THRESHOLD_MODELO)
+from utils.cashflow import LGD_PADRAO, PRAZO_PADRAO
+from utils.evaluation import ThresholdSweep, lttb_downsample, bootstrap_metrics, optimize_threshold
+
+# Pontos enviados ao navegador por curva
+CURVE_POINTS = 2000
+
+
+@st.cache_resource
+def get_threshold_sweep():
+    # Ordenação única dos scores de teste; cada threshold é consultado por busca binária
+    test_scores = load_test_scores()
+    if test_scores is None:
+        return None
+    return ThresholdSweep(test_scores['target'], test_scores['score'])
+
+
+@st.cache_data
+def get_curves():
+    # Curvas exatas reduzidas uma única vez; o navegador recebe só CURVE_POINTS por curva
+    sweep = get_threshold_sweep()
+    fpr, tpr = lttb_downsample(*sweep.roc_curve(), CURVE_POINTS)
+    recall, precision = lttb_downsample(*sweep.pr_curve(), CURVE_POINTS)
+    return {
+        'fpr': fpr, 'tpr': tpr, 'auc': sweep.auc(),
+        'recall': recall, 'precision': precision, 'ap': sweep.average_precision(),
+        'base_rate': sweep.n_pos / sweep.n
+    }
+
+
+@st.cache_data
+def get_bootstrap_intervals(threshold):
+    # Reamostragens vetorizadas sobre a ordenação já feita pelo sweep
+    return bootstrap_metrics(get_threshold_sweep(), threshold)
 
 
 st.markdown('<h2 class="section-header">📊 Análise Detalhada de Modelos</h2>', 
@@ -11,7 +47,7 @@ st.markdown('<h2 class="section-header">📊 Análise Detalhada de Modelos</h2>'
 
 # Carregando dados dos modelos
 model_data = load_model_data()
-cm_data = load_confusion_matrix_data()
+sweep = get_threshold_sweep()
 
 # Comparação de AUC
 st.markdown("### 🎯 Comparação de Performance - AUC")
@@ -44,6 +80,23 @@ st.markdown("---")
 # Matriz de Confusão
 st.markdown("### 🔍 Matriz de Confusão - Análise Detalhada")
 
+if sweep is not None:
+    threshold = st.slider(
+        "Threshold de decisão",
+        min_value=0.0,
+        max_value=1.0,
+        value=THRESHOLD_MODELO,
+        step=0.0001,
+        format="%.4f",
+        help="Score a partir do qual o cliente é classificado como inadimplente"
+    )
+    cm_data = sweep.confusion_matrix(threshold)
+else:
+    threshold = THRESHOLD_MODELO
+    cm_data = load_confusion_matrix_data()
+    st.caption("Matriz simulada a partir das métricas do relatório. Execute o notebook para exportar "
+               "`notebook/test_scores.parquet` e ver a matriz real em qualquer threshold.")
+
 col1, col2 = st.columns([2, 1])
 
 with col1:
@@ -67,6 +120,19 @@ with col2:
     st.metric("Especificidade", format_percentage(metrics['specificity'] * 100),
                 help="% de adimplentes corretamente identificados")
 
+if sweep is not None:
+    st.markdown("#### 📏 Intervalos de Confiança (Bootstrap 95%)")
+    with st.spinner("Calculando reamostragens..."):
+        intervals = get_bootstrap_intervals(threshold)
+    st.dataframe(
+        intervals.rename(columns={'metrica': 'Métrica', 'estimativa': 'Estimativa',
+                                  'ic_inferior': 'IC Inferior', 'ic_superior': 'IC Superior'}),
+        use_container_width=True,
+        hide_index=True
+    )
+    st.caption("Reamostragens do conjunto de teste com reposição; o intervalo indica a incerteza "
+               "das métricas no threshold selecionado.")
+
 # Interpretação da matriz
 st.markdown("#### 💡 Interpretação de Negócio")
 
@@ -75,7 +141,7 @@ col1, col2 = st.columns(2)
 with col1:
     st.markdown(f"""
     **Pontos Fortes:**
-    - ✅ **{tp} inadimplentes detectados** (36% recall)
+    - ✅ **{tp} inadimplentes detectados** ({metrics['recall']:.0%} recall)
     - ✅ **{tn} adimplentes aprovados** corretamente
     - ✅ **Especificidade de {metrics['specificity']:.1%}** (baixos falsos positivos para adimplentes)
     """)
@@ -107,18 +173,24 @@ st.markdown("### 📈 Curva ROC - Análise de Discriminação")
 
 col1, col2 = st.columns([2, 1])
 
+curves = get_curves() if sweep is not None else None
+auc_value = curves['auc'] if curves is not None else 0.7163
+
 with col1:
-    fig_roc = create_roc_curve()
+    if curves is not None:
+        fig_roc = create_roc_curve(curves['fpr'], curves['tpr'], auc_value, CURVE_POINTS)
+    else:
+        fig_roc = create_roc_curve()
     st.plotly_chart(fig_roc, use_container_width=True)
 
 with col2:
     st.markdown("#### 🎯 Análise da Curva ROC")
-    st.markdown("""
+    st.markdown(f"""
     **Como interpretar:**
     - **Eixo X:** Taxa de Falsos Positivos
     - **Eixo Y:** Taxa de Verdadeiros Positivos
     - **Diagonal:** Performance aleatória
-    - **Área Destacada:** AUC = 0.7163
+    - **Área Destacada:** AUC = {auc_value:.4f}
     
     **Nosso Modelo:**
     - Curva bem acima da diagonal
@@ -132,6 +204,88 @@ with col2:
     AUC > 0.7 indica performance adequada para ambiente de produção.
     """)
 
+if curves is not None:
+    st.markdown("### 🎯 Curva Precision-Recall")
+    
+    col1, col2 = st.columns([2, 1])
+    
+    with col1:
+        fig_pr = create_pr_curve(curves['recall'], curves['precision'], curves['ap'],
+                                 curves['base_rate'], CURVE_POINTS)
+        st.plotly_chart(fig_pr, use_container_width=True)
+    
+    with col2:
+        st.markdown("#### 📊 Leitura da Curva")
+        st.markdown(f"""
+        - **Average Precision:** {curves['ap']:.4f}
+        - **Taxa de inadimplentes:** {curves['base_rate']:.2%}
+        - **Avaliação:** {sweep.n:,} previsões, {sweep.thresholds.size:,} thresholds distintos
+        
+        Em bases desbalanceadas a curva PR evidencia o custo em falsos positivos
+        de cada ganho de recall.
+        """)
+
+if sweep is not None:
+    st.markdown("---")
+    st.markdown("### 💰 Threshold Ótimo por Lucro")
+    st.markdown("""
+    O threshold de 0.0922 foi escolhido por F1 no notebook. Aqui cada threshold é avaliado pelo
+    resultado financeiro: adimplentes aprovados rendem a margem de juros do prazo e inadimplentes
+    aprovados geram perda sobre o valor emprestado.
+    """)
+    
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        valor_emprestimo = st.number_input("Valor Médio do Empréstimo (R$)", min_value=500,
+                                           max_value=500_000, value=10_000, step=500)
+    
+    with col2:
+        taxa_juros_otimizacao = st.number_input("Taxa de Juros Mensal (%)", min_value=0.1,
+                                                max_value=10.0, value=3.0, step=0.1)
+    
+    with col3:
+        prazo_otimizacao = st.selectbox("Prazo (meses)", [6, 12, 24, 36], index=[6, 12, 24, 36].index(PRAZO_PADRAO))
+    
+    with col4:
+        lgd_otimizacao = st.slider("Perda Dada a Inadimplência (%)", min_value=10, max_value=100,
+                                   value=int(LGD_PADRAO * 100), step=5) / 100
+    
+    otimizacao = optimize_threshold(sweep, valor_emprestimo, taxa_juros_otimizacao,
+                                    prazo_otimizacao, lgd_otimizacao)
+    curva_lucro = otimizacao['curva']
+    lucro_atual = float(curva_lucro['lucro'].iloc[min(np.searchsorted(curva_lucro['threshold'], THRESHOLD_MODELO),
+                                                      len(curva_lucro) - 1)])
+    linha_otima = curva_lucro.loc[curva_lucro['threshold'] == otimizacao['threshold']].iloc[0]
+    
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Threshold Ótimo", f"{otimizacao['threshold']:.4f}",
+                delta=f"{otimizacao['threshold'] - THRESHOLD_MODELO:+.4f} vs. atual", delta_color="off")
+    col2.metric("Lucro por 1.000 Solicitantes", format_currency(otimizacao['lucro'] * 1000),
+                delta=format_currency((otimizacao['lucro'] - lucro_atual) * 1000) + " vs. atual")
+    col3.metric("Taxa de Aprovação", format_percentage(linha_otima['taxa_aprovacao'] * 100))
+    col4.metric("Inadimplência dos Aprovados", format_percentage(linha_otima['inadimplencia_aprovados'] * 100))
+    
+    col1, col2 = st.columns([2, 1])
+    
+    with col1:
+        fig_lucro = create_profit_curve(curva_lucro['threshold'], curva_lucro['lucro'],
+                                        otimizacao['threshold'], THRESHOLD_MODELO, CURVE_POINTS)
+        st.plotly_chart(fig_lucro, use_container_width=True)
+    
+    with col2:
+        st.markdown("#### 🔗 Premissas para o ROI")
+        roi_inputs = otimizacao['roi_inputs']
+        roi_otimo = calculate_roi(volume_mensal=25_000_000, investimento_inicial=500_000, meses=12, **roi_inputs)
+        st.markdown(f"""
+        - **Margem de juros no prazo:** {otimizacao['margem']:.1%}
+        - **Inadimplência sem o modelo:** {roi_inputs['taxa_inadimplencia_atual']:.2f}%
+        - **Redução com o threshold ótimo:** {roi_inputs['reducao_inadimplencia']:.1f}%
+        - **ROI em 12 meses** (R$ 25M/mês, investimento de R$ 500 mil): {roi_otimo['roi_percentual']:.1f}%
+        
+        Use estas premissas na página de ROI para projetar o retorno com o threshold ótimo.
+        """)
+
 st.markdown("---")
 
 # Comparação detalhada entre modelos
@@ -1,9 +1,36 @@
 
+import numpy as np
 import streamlit as st
 import pandas as pd
-from utils.data_loader import load_roi_scenarios
-from utils.charts import create_roi_timeline, COLORS
+from utils.data_loader import ROI_SCENARIO_COLUMNS, load_roi_scenarios, read_roi_scenarios, roi_scenarios_frame
+from utils.aggregations import histogram_summary
+from utils.charts import (create_roi_timeline, create_roi_sensitivity, create_simulation_distribution,
+                          create_cashflow_chart, COLORS)
 from utils.calculations import calculate_roi, format_currency, format_percentage
+from utils.cashflow import LGD_PADRAO, PRAZO_PADRAO, calculate_roi_cashflow
+from utils.monte_carlo import N_SIMULATIONS, simulate_roi, spread_distribution
+
+
+# Pontos por eixo da grade de sensibilidade (redução x inadimplência)
+SENSITIVITY_POINTS = 200
+
+# Bins dos histogramas da simulação
+SIMULATION_BINS = 80
+
+# Rótulos das distribuições no formulário
+DISTRIBUICOES = {'Triangular': 'triangular', 'Normal': 'normal', 'Uniforme': 'uniforme', 'Fixo': 'fixo'}
+
+
+@st.cache_data
+def get_monte_carlo(premissas, taxa_juros, meses):
+    # Apenas percentis e histogramas ficam em cache, não as simulações
+    simulacao = simulate_roi(*premissas, taxa_juros=taxa_juros, meses=meses)
+    payback = np.minimum(simulacao.pop('payback'), 2 * meses)
+    roi = simulacao.pop('roi')
+    simulacao['roi_hist'] = histogram_summary(roi, SIMULATION_BINS,
+                                              tuple(np.percentile(roi, [0.1, 99.9])))
+    simulacao['payback_hist'] = histogram_summary(payback, SIMULATION_BINS, (0.0, 2.0 * meses))
+    return simulacao
 
 
 st.markdown('<h2 class="section-header">💰 Calculadora de ROI Interativa</h2>', 
@@ -215,28 +242,26 @@ if calcular:
     with col2:
         st.markdown("#### 💡 Análise de Sensibilidade")
         
-        # Análise de sensibilidade simples
-        scenarios_sensitivity = []
-        for factor in [0.5, 0.75, 1.0, 1.25, 1.5]:
-            roi_temp = calculate_roi(
-                volume_mensal=volume_mensal,
-                taxa_juros=taxa_juros,
-                taxa_inadimplencia_atual=taxa_inadimplencia,
-                reducao_inadimplencia=reducao_inadimplencia * factor,
-                investimento_inicial=investimento_inicial,
-                meses=periodo_analise
-            )
-            scenarios_sensitivity.append({
-                'Cenário': f"{factor*100:.0f}% da redução",
-                'ROI': f"{roi_temp['roi_percentual']:.1f}%"
-            })
+        # Grade completa em uma única chamada: reduções nas colunas, inadimplência nas linhas
+        reducoes = np.linspace(5.0, 50.0, SENSITIVITY_POINTS)
+        taxas = np.linspace(1.0, 20.0, SENSITIVITY_POINTS)
+        sensibilidade = calculate_roi(
+            volume_mensal=volume_mensal,
+            taxa_juros=taxa_juros,
+            taxa_inadimplencia_atual=taxas[:, None],
+            reducao_inadimplencia=reducoes[None, :],
+            investimento_inicial=investimento_inicial,
+            meses=periodo_analise
+        )
         
-        sensitivity_df = pd.DataFrame(scenarios_sensitivity)
-        st.dataframe(sensitivity_df, use_container_width=True, hide_index=True)
+        fig_sensibilidade = create_roi_sensitivity(reducoes, taxas, sensibilidade['roi_percentual'],
+                                                   reducao_inadimplencia, taxa_inadimplencia)
+        st.plotly_chart(fig_sensibilidade, use_container_width=True)
         
         st.info("""
         **💭 Análise de Sensibilidade:**
-        Mostra como o ROI varia conforme diferentes níveis de eficácia do modelo.
+        Mostra como o ROI varia conforme a eficácia do modelo e a inadimplência atual.
+        A linha tracejada separa os cenários com retorno positivo dos com prejuízo.
         """)
     
     # Gráfico de timeline ROI
@@ -253,7 +278,7 @@ if calcular:
         }
     }
     
-    fig_timeline = create_roi_timeline(timeline_scenarios)
+    fig_timeline = create_roi_timeline(roi_scenarios_frame(timeline_scenarios), investimento_inicial, periodo_analise)
     st.plotly_chart(fig_timeline, use_container_width=True)
     
     # Insights e recomendações
@@ -349,6 +374,175 @@ if calcular:
         Use os resultados exportados para apresentações executivas e documentação do projeto.
         """)
 
+# Comparação de cenários: pré-definidos, atual e, opcionalmente, um arquivo com muitos cenários
+st.markdown("---")
+st.markdown("### 📂 Comparação de Cenários")
+
+col1, col2 = st.columns([2, 1])
+
+with col1:
+    arquivo_cenarios = st.file_uploader(
+        "Arquivo de cenários (opcional)",
+        type=['csv', 'parquet'],
+        help="Uma linha por cenário com as colunas " + ", ".join(ROI_SCENARIO_COLUMNS) +
+             "; opcionais: cenario (nome) e investimento_inicial"
+    )
+
+with col2:
+    horizonte_cenarios = st.number_input("Horizonte (meses)", min_value=1, max_value=240, value=36, step=6)
+
+cenarios_comparacao = roi_scenarios_frame({
+    **{nome: scenarios[chave] for nome, chave in
+       [("Conservador", "Conservative"), ("Moderado", "Moderate"), ("Agressivo", "Aggressive")]},
+    'Atual': {
+        'volume_mensal': volume_mensal,
+        'taxa_juros': taxa_juros,
+        'taxa_inadimplencia_atual': taxa_inadimplencia,
+        'reducao_inadimplencia': reducao_inadimplencia
+    }
+})
+
+if arquivo_cenarios is not None:
+    try:
+        cenarios_comparacao = read_roi_scenarios(arquivo_cenarios, arquivo_cenarios.name)
+        st.caption(f"{len(cenarios_comparacao):,} cenários carregados de {arquivo_cenarios.name}".replace(",", "."))
+    except ValueError as erro:
+        st.error(str(erro))
+
+fig_cenarios = create_roi_timeline(cenarios_comparacao, investimento_inicial, int(horizonte_cenarios))
+st.plotly_chart(fig_cenarios, use_container_width=True)
+
+# Simulação Monte Carlo (formulário próprio: permanece disponível após o cálculo)
+st.markdown("---")
+st.markdown("### 🎲 Simulação Monte Carlo")
+st.markdown(f"""
+Em vez de uma premissa pontual, cada parâmetro varia segundo uma distribuição centrada
+no valor configurado acima. São {N_SIMULATIONS:,} cenários sorteados em conjunto.
+""".replace(",", "."))
+
+with st.form("monte_carlo"):
+    parametros = [
+        ("Volume Mensal", volume_mensal, 20.0),
+        ("Taxa de Inadimplência", taxa_inadimplencia, 20.0),
+        ("Redução Esperada", reducao_inadimplencia, 40.0),
+        ("Investimento Inicial", investimento_inicial, 25.0)
+    ]
+    premissas = []
+    colunas = st.columns(len(parametros))
+    for coluna, (nome, valor, variacao_padrao) in zip(colunas, parametros):
+        with coluna:
+            distribuicao = st.selectbox(f"{nome}", list(DISTRIBUICOES), key=f"mc_dist_{nome}")
+            variacao = st.number_input(
+                "Variação (%)",
+                min_value=0.0,
+                max_value=100.0,
+                value=variacao_padrao,
+                step=5.0,
+                key=f"mc_var_{nome}",
+                help="Amplitude (±) da triangular e da uniforme; desvio padrão da normal"
+            )
+            premissas.append(spread_distribution(DISTRIBUICOES[distribuicao], float(valor), variacao / 100))
+    
+    simular = st.form_submit_button("🎲 Simular", use_container_width=True)
+
+if simular:
+    simulacao = get_monte_carlo(tuple(premissas), float(taxa_juros), int(periodo_analise))
+    
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("ROI P5", f"{simulacao['roi_p5']:.1f}%", help="5% dos cenários têm ROI abaixo deste valor")
+    col2.metric("ROI P50", f"{simulacao['roi_p50']:.1f}%", help="ROI mediano")
+    col3.metric("ROI P95", f"{simulacao['roi_p95']:.1f}%", help="5% dos cenários têm ROI acima deste valor")
+    col4.metric("Probabilidade de Prejuízo", format_percentage(simulacao['prob_prejuizo'] * 100),
+                help="Cenários com ROI negativo")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        fig_roi = create_simulation_distribution(
+            simulacao['roi_hist'],
+            {'P5': simulacao['roi_p5'], 'P50': simulacao['roi_p50'], 'P95': simulacao['roi_p95']},
+            'Distribuição do ROI', 'ROI (%)', COLORS['light_blue'], ',.0f'
+        )
+        st.plotly_chart(fig_roi, use_container_width=True)
+    
+    with col2:
+        fig_payback = create_simulation_distribution(
+            simulacao['payback_hist'],
+            {'P50': simulacao['payback_p50'], 'P95': simulacao['payback_p95']},
+            'Distribuição do Payback', f'Payback (meses; último bin: {2 * periodo_analise} ou mais)',
+            COLORS['warning'], '.1f'
+        )
+        st.plotly_chart(fig_payback, use_container_width=True)
+    
+    payback_p95 = f"{simulacao['payback_p95']:.1f} meses" if np.isfinite(simulacao['payback_p95']) else "sem retorno"
+    st.info(f"""
+    **💭 Leitura da Simulação:**
+    - Em 90% dos cenários o ROI fica entre {simulacao['roi_p5']:.1f}% e {simulacao['roi_p95']:.1f}%
+    - Payback mediano de {simulacao['payback_p50']:.1f} meses (P95: {payback_p95})
+    - {format_percentage(simulacao['prob_payback_periodo'] * 100)} dos cenários recuperam o investimento em {periodo_analise} meses
+    """)
+
+# Fluxo de caixa por safra (Tabela Price com inadimplência por mês de vida)
+st.markdown("---")
+st.markdown("### 🏦 Fluxo de Caixa por Safra")
+st.markdown("""
+Cada mês (ou dia) de originação forma uma safra amortizada pela Tabela Price à taxa de juros
+configurada. A inadimplência acontece ao longo da vida dos contratos: quem entra em default
+deixa de pagar juros e gera perda sobre o saldo devedor. A economia do modelo inclui os juros
+dos contratos que deixam de inadimplir.
+""")
+
+with st.form("fluxo_caixa"):
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        prazo = st.selectbox("Prazo dos Empréstimos (meses)", [6, 12, 24, 36],
+                             index=[6, 12, 24, 36].index(PRAZO_PADRAO))
+    
+    with col2:
+        lgd = st.slider("Perda Dada a Inadimplência (%)", min_value=10, max_value=100,
+                        value=int(LGD_PADRAO * 100), step=5,
+                        help="Parcela do saldo devedor não recuperada após o default") / 100
+    
+    with col3:
+        granularidade = st.radio("Safras", ["Mensais", "Diárias"], horizontal=True)
+    
+    projetar = st.form_submit_button("🏦 Projetar Fluxo de Caixa", use_container_width=True)
+
+if projetar:
+    fluxo = calculate_roi_cashflow(
+        volume_mensal=volume_mensal,
+        taxa_juros=taxa_juros,
+        taxa_inadimplencia_atual=taxa_inadimplencia,
+        reducao_inadimplencia=reducao_inadimplencia,
+        investimento_inicial=investimento_inicial,
+        meses=periodo_analise,
+        prazo=prazo,
+        lgd=lgd,
+        safras_por_mes=30 if granularidade == "Diárias" else 1
+    )
+    horizonte = len(fluxo['economia_por_mes'])
+    
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("ROI (Fluxo de Caixa)", f"{fluxo['roi_percentual']:.1f}%",
+                help=f"Originação por {periodo_analise} meses e liquidação da carteira ({horizonte} meses)")
+    col2.metric("Economia Total", format_currency(fluxo['economia_total']))
+    col3.metric("Juros Adicionais", format_currency(fluxo['juros_com_modelo'] - fluxo['juros_atuais']),
+                help="Juros pagos pelos contratos que deixam de inadimplir")
+    payback_fluxo = f"{fluxo['payback_meses']:.1f} meses" if np.isfinite(fluxo['payback_meses']) else "N/A"
+    col4.metric("Payback", payback_fluxo, help="Mês em que a economia acumulada cobre o investimento")
+    
+    fig_fluxo = create_cashflow_chart(fluxo['economia_por_mes'], investimento_inicial)
+    st.plotly_chart(fig_fluxo, use_container_width=True)
+    
+    st.dataframe(pd.DataFrame({
+        'Métrica': ['Perdas', 'Juros Recebidos', 'Resultado de Crédito'],
+        'Cenário Atual': [format_currency(fluxo['perdas_atuais']), format_currency(fluxo['juros_atuais']),
+                          format_currency(fluxo['juros_atuais'] - fluxo['perdas_atuais'])],
+        'Com Novo Modelo': [format_currency(fluxo['perdas_com_modelo']), format_currency(fluxo['juros_com_modelo']),
+                            format_currency(fluxo['juros_com_modelo'] - fluxo['perdas_com_modelo'])]
+    }), use_container_width=True, hide_index=True)
+
 # Cenários de exemplo para demonstração
 
 with st.expander("📋 Cenários de Referência"):
@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+
+# Bins dos histogramas enviados aos gráficos
+SCORE_BINS = 50
+AMOUNT_BINS = 60
+
+# Pontos no máximo enviados ao gráfico de dispersão
+SCATTER_SAMPLE = 20_000
+
+# Colunas da carteira usadas pelos resumos (projeção na leitura)
+SUMMARY_COLUMNS = ['risk_score', 'risk_category', 'loan_amount', 'monthly_income']
+
+def histogram_summary(values, bins, value_range=None):
+    """
+    Histograma de uma coluna como um DataFrame pequeno
+
+    Args:
+        values: Valores da coluna
+        bins: Número de bins
+        value_range: (mínimo, máximo) fixo; None usa os extremos dos dados
+
+    Returns:
+        DataFrame: bin_start, bin_end e count, uma linha por bin
+    """
+
+    values = np.asarray(values)
+    if value_range is None:
+        value_range = (float(values.min()), float(values.max())) if values.size else (0.0, 1.0)
+
+    counts, edges = np.histogram(values, bins=bins, range=value_range)
+    return pd.DataFrame({'bin_start': edges[:-1], 'bin_end': edges[1:], 'count': counts})
+
+def category_summary(categories):
+    """
+    Contagem e participação de cada categoria, pelos códigos do Categorical
+
+    Args:
+        categories: Série categórica (ex.: risk_category)
+
+    Returns:
+        DataFrame: category, count e share, na ordem das categorias
+    """
+
+    categorical = pd.Categorical(categories)
+    counts = np.bincount(categorical.codes[categorical.codes >= 0], minlength=len(categorical.categories))
+    total = max(counts.sum(), 1)
+    return pd.DataFrame({'category': categorical.categories, 'count': counts, 'share': counts / total})
+
+def summarize_portfolio(portfolio, score_bins=SCORE_BINS, amount_bins=AMOUNT_BINS,
+                        scatter_sample=SCATTER_SAMPLE, seed=42):
+    """
+    Resume a carteira em tabelas de tamanho fixo para os gráficos do dashboard
+
+    O custo de montar e enviar os gráficos passa a depender apenas do número de
+    bins (e da amostra do gráfico de dispersão), não do número de clientes.
+
+    Args:
+        portfolio: DataFrame de generate_sample_portfolio
+        score_bins: Bins do histograma de risk_score em [0, 1]
+        amount_bins: Bins dos histogramas de loan_amount e monthly_income
+        scatter_sample: Tamanho máximo da amostra para o gráfico de dispersão
+        seed: Semente da amostragem
+
+    Returns:
+        dict: n_rows, risk_category, risk_score, loan_amount, monthly_income e sample
+    """
+
+    n_rows = len(portfolio)
+    rng = np.random.default_rng(seed)
+    sample_index = np.sort(rng.choice(n_rows, size=min(scatter_sample, n_rows), replace=False))
+
+    return {
+        'n_rows': n_rows,
+        'risk_category': category_summary(portfolio['risk_category']),
+        'risk_score': histogram_summary(portfolio['risk_score'], score_bins, (0.0, 1.0)),
+        'loan_amount': histogram_summary(portfolio['loan_amount'], amount_bins),
+        'monthly_income': histogram_summary(portfolio['monthly_income'], amount_bins),
+        'sample': portfolio.iloc[sample_index].reset_index(drop=True)
+    }
@@ -0,0 +1,179 @@
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pv
+import pyarrow.parquet as pq
+
+from utils.calculations import THRESHOLD_MODELO, simulate_credit_risk_batch
+from utils.scoring import ID_COLUMNS, score_frame
+
+# Colunas de entrada do motor de regras (mesmos nomes de simulate_credit_risk)
+RULE_COLUMNS = ['idade', 'renda_mensal', 'valor_emprestimo', 'historico_credito', 'finalidade_emprestimo']
+
+# Linhas por lote de escoragem
+CHUNK_ROWS = 50_000
+
+# Tamanho estimado de uma linha de CSV, usado para converter linhas por lote em bytes por bloco
+CSV_BYTES_PER_ROW = 160
+
+def _is_parquet(file_name):
+    return file_name.lower().endswith('.parquet')
+
+def _csv_block_size(chunk_rows):
+    return max(chunk_rows * CSV_BYTES_PER_ROW, 1 << 20)
+
+def csv_column_types(model=None):
+    """
+    Tipos explícitos das colunas de entrada do CSV
+
+    Sem tipos fixos, o leitor infere cada coluna pelo primeiro bloco, e um bloco
+    posterior com um decimal ou valor vazio em uma coluna inferida como inteira
+    interrompe a escoragem no meio do arquivo.
+
+    Args:
+        model: Modelo com feature_name_; suas features são lidas como float64
+
+    Returns:
+        dict: Coluna -> tipo pyarrow (colunas ausentes do arquivo são ignoradas pelo leitor)
+    """
+
+    # Identificadores são texto (ex.: C0000000), como no Parquet de treino
+    column_types = {col: pa.string() for col in ID_COLUMNS}
+    column_types.update({'idade': pa.float64(), 'renda_mensal': pa.float64(), 'valor_emprestimo': pa.float64(),
+                         'historico_credito': pa.string(), 'finalidade_emprestimo': pa.string()})
+    if model is not None:
+        column_types.update({col: pa.float64() for col in model.feature_name_ if col not in column_types})
+    return column_types
+
+def _open_csv(file, chunk_rows=CHUNK_ROWS, column_types=None):
+    return pv.open_csv(
+        file,
+        read_options=pv.ReadOptions(block_size=_csv_block_size(chunk_rows)),
+        convert_options=pv.ConvertOptions(
+            column_types=column_types if column_types is not None else csv_column_types()
+        )
+    )
+
+def read_columns(file, file_name):
+    """
+    Colunas disponíveis no arquivo, lendo apenas o schema (Parquet) ou o primeiro bloco (CSV)
+
+    Args:
+        file: Arquivo binário (ex.: UploadedFile do Streamlit)
+        file_name: Nome do arquivo, usado para identificar o formato
+
+    Returns:
+        list: Nomes das colunas
+    """
+
+    file.seek(0)
+    if _is_parquet(file_name):
+        columns = pq.ParquetFile(file).schema_arrow.names
+    else:
+        columns = _open_csv(file).schema.names
+    file.seek(0)
+    return columns
+
+def iter_batches(file, file_name, chunk_rows=CHUNK_ROWS, columns=None, column_types=None):
+    """
+    Lê o arquivo em lotes, sem carregá-lo inteiro em memória
+
+    Args:
+        file: Arquivo binário posicionável
+        file_name: Nome do arquivo (.csv ou .parquet)
+        chunk_rows: Linhas por lote (no CSV, aproximado pelo tamanho do bloco de leitura)
+        columns: Colunas lidas (Parquet); None lê todas
+        column_types: Tipos das colunas do CSV (padrão: csv_column_types() sem modelo)
+
+    Yields:
+        tuple: (DataFrame do lote, fração do arquivo já lida)
+    """
+
+    file.seek(0)
+    if _is_parquet(file_name):
+        parquet_file = pq.ParquetFile(file)
+        total_rows = max(parquet_file.metadata.num_rows, 1)
+        rows_read = 0
+        for batch in parquet_file.iter_batches(batch_size=chunk_rows, columns=columns):
+            rows_read += batch.num_rows
+            yield batch.to_pandas(), rows_read / total_rows
+        return
+
+    file.seek(0, 2)
+    total_bytes = max(file.tell(), 1)
+    file.seek(0)
+
+    # O leitor faz read-ahead, então a posição do arquivo não indica o progresso;
+    # cada lote corresponde a um bloco de block_size bytes
+    block_size = _csv_block_size(chunk_rows)
+    for blocks_read, batch in enumerate(_open_csv(file, chunk_rows, column_types), start=1):
+        yield batch.to_pandas(), min(blocks_read * block_size / total_bytes, 1.0)
+
+def score_chunk(df, first_row, use_rules=True, model=None, threshold=THRESHOLD_MODELO):
+    """
+    Escora um lote com o motor de regras e/ou o modelo
+
+    Args:
+        df: Lote de solicitantes
+        first_row: Posição da primeira linha do lote no arquivo
+        use_rules: Aplica simulate_credit_risk_batch (exige RULE_COLUMNS)
+        model: Modelo com feature_name_ e predict_proba; None não aplica o modelo
+        threshold: Threshold de decisão do modelo
+
+    Returns:
+        DataFrame: linha, identificadores e resultados de cada motor
+    """
+
+    scored = pd.DataFrame({'linha': pd.RangeIndex(first_row, first_row + len(df))})
+    for col in ID_COLUMNS:
+        if col in df.columns:
+            scored[col] = df[col].to_numpy()
+
+    if use_rules:
+        regras = simulate_credit_risk_batch(df)
+        scored['regra_score'] = regras['score'].to_numpy()
+        scored['regra_aprovado'] = regras['aprovado'].to_numpy()
+        scored['regra_classificacao'] = regras['classificacao_risco'].astype(str).to_numpy()
+        scored['regra_motivo'] = regras['motivo_principal'].astype(str).to_numpy()
+
+    if model is not None:
+        modelo = score_frame(df, model, threshold)
+        scored['modelo_score'] = modelo['score'].to_numpy()
+        scored['modelo_aprovado'] = modelo['aprovado'].to_numpy()
+
+    return scored
+
+class ChunkedWriter:
+    """
+    Grava lotes escorados em Parquet (um row group por lote) ou CSV, de forma incremental
+
+    O schema é fixado pelo primeiro lote, então nenhum resultado precisa ficar em memória.
+    """
+
+    def __init__(self, path, file_format='parquet'):
+        self.path = path
+        self.file_format = file_format
+        self.rows = 0
+        self._writer = None
+        self._schema = None
+
+    def write(self, df):
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        if self._writer is None:
+            self._schema = table.schema.remove_metadata()
+            if self.file_format == 'parquet':
+                self._writer = pq.ParquetWriter(self.path, self._schema)
+            else:
+                self._writer = pv.CSVWriter(self.path, self._schema)
+        self._writer.write_table(table.select(self._schema.names).cast(self._schema))
+        self.rows += len(df)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
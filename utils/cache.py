@@ -0,0 +1,215 @@
+import hashlib
+import json
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+MAX_ENTRIES = 10_000
+TTL_SECONDS = 3600
+
+# Intervalo mínimo entre verificações do arquivo do modelo (evita um os.stat por consulta)
+MODEL_CHECK_SECONDS = 1.0
+
+# Sentinela para diferenciar "ausente" de um resultado None em cache
+_MISSING = object()
+
+def _canonical_value(value):
+    """Normaliza um valor para que representações equivalentes gerem o mesmo hash"""
+
+    if isinstance(value, np.generic):
+        value = value.item()
+    if value is None or isinstance(value, (bool, str)):
+        return value
+    if isinstance(value, (int, float)):
+        value = float(value)
+        if math.isnan(value):
+            return None
+        # -0.0 e 0.0 são o mesmo valor de feature
+        return value + 0.0
+    return str(value)
+
+def feature_hash(features):
+    """
+    Hash estável de um vetor de features
+
+    A ordem das chaves, tipos numéricos (int, float, NumPy) e NaN/None não
+    alteram o hash, de modo que reenvios do mesmo solicitante caem na mesma entrada.
+
+    Args:
+        features: Dicionário nome -> valor
+
+    Returns:
+        str: Hash hexadecimal de 32 caracteres
+    """
+
+    canonical = {str(key): _canonical_value(value) for key, value in features.items()}
+    payload = json.dumps(canonical, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+
+def file_signature(path):
+    """Assinatura (mtime, tamanho) usada para detectar troca do arquivo do modelo"""
+
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+class ScoreCache:
+    """
+    Cache de scores com LRU, TTL por entrada e contadores de acerto
+
+    Quando model_path é informado, qualquer alteração no arquivo do modelo
+    (mtime ou tamanho) descarta todas as entradas na próxima consulta; antes
+    disso, on_model_change(model_path) é chamado para que o dono do cache
+    recarregue o modelo, e os novos scores nunca vêm do modelo antigo.
+    key_function converte a consulta em chave (por padrão, feature_hash de um
+    dicionário de features). O arquivo do modelo é verificado no máximo a cada
+    check_seconds. Todas as operações são protegidas por um lock, de modo que
+    a mesma instância pode ser compartilhada entre threads (ex.: sessões do Streamlit).
+    """
+
+    def __init__(self, max_entries=MAX_ENTRIES, ttl_seconds=TTL_SECONDS, model_path=None,
+                 clock=time.monotonic, key_function=feature_hash, check_seconds=MODEL_CHECK_SECONDS,
+                 on_model_change=None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.model_path = model_path
+        self.clock = clock
+        self.key_function = key_function
+        self.check_seconds = check_seconds
+        self.on_model_change = on_model_change
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+        self._model_signature = file_signature(model_path) if model_path else None
+        self._next_check = clock() + check_seconds
+
+    def _check_model(self):
+        if self.model_path is None:
+            return
+        now = self.clock()
+        if now < self._next_check:
+            return
+        self._next_check = now + self.check_seconds
+        signature = file_signature(self.model_path)
+        if signature != self._model_signature:
+            # Se o recarregamento falhar, a assinatura antiga é mantida e a troca é tentada de novo
+            if self.on_model_change is not None:
+                self.on_model_change(self.model_path)
+            self._model_signature = signature
+            self.invalidate()
+
+    def check_model(self):
+        """Verifica o arquivo do modelo (respeitando check_seconds) antes de usar o modelo em memória"""
+
+        with self._lock:
+            self._check_model()
+
+    def get(self, features, default=None):
+        """Retorna o valor em cache para as features ou default"""
+
+        key = self.key_function(features)
+        with self._lock:
+            self._check_model()
+            entry = self._entries.get(key)
+
+            if entry is not None and entry[0] > self.clock():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return default
+
+    def put(self, features, value):
+        """Armazena o valor, removendo a entrada menos usada quando cheio"""
+
+        key = self.key_function(features)
+        with self._lock:
+            self._entries[key] = (self.clock() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_many(self, keys, default=None):
+        """
+        Consulta em lote por chaves já calculadas (uma verificação do modelo e um lock por lote)
+
+        Args:
+            keys: Chaves no formato de key_function
+            default: Valor retornado para as chaves ausentes ou expiradas
+
+        Returns:
+            list: Valor em cache (ou default) de cada chave, na mesma ordem
+        """
+
+        with self._lock:
+            self._check_model()
+            now = self.clock()
+            values = []
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] > now:
+                    self._entries.move_to_end(key)
+                    values.append(entry[1])
+                    continue
+                if entry is not None:
+                    del self._entries[key]
+                values.append(default)
+            hits = sum(value is not default for value in values)
+            self.hits += hits
+            self.misses += len(values) - hits
+            return values
+
+    def put_many(self, keys, values):
+        """Armazena vários valores por chaves já calculadas, com uma única evicção ao final"""
+
+        with self._lock:
+            expires = self.clock() + self.ttl_seconds
+            for key, value in zip(keys, values):
+                self._entries[key] = (expires, value)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_compute(self, features, compute):
+        """
+        Consulta o cache e, em caso de miss, calcula e armazena o resultado
+
+        Args:
+            features: Dicionário de features do solicitante
+            compute: Função sem argumentos que calcula o resultado
+
+        Returns:
+            Resultado em cache ou recém-calculado
+        """
+
+        value = self.get(features, default=_MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.put(features, value)
+        return value
+
+    def invalidate(self):
+        """Descarta todas as entradas (ex.: após retreino do modelo)"""
+
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total > 0 else 0,
+                'size': len(self._entries),
+                'invalidations': self.invalidations
+            }
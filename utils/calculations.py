@@ -1,12 +1,41 @@
 
+from bisect import bisect_left
+
 import numpy as np
 import pandas as pd
 
+# Threshold otimizado no notebook (F1 do modelo LightGBM + SMOTE)
+THRESHOLD_MODELO = 0.0922
+
+# Ajustes do simulador por histórico de crédito e finalidade do empréstimo
+HISTORICO_AJUSTES = {
+    'Excelente': -0.2,
+    'Bom': -0.1,
+    'Regular': 0.05,
+    'Ruim': 0.25
+}
+FINALIDADE_AJUSTES = {
+    'Compra de veículo': -0.02,
+    'Reforma/construção': -0.01,
+    'Consolidação de dívidas': 0.05,
+    'Capital de giro': 0.03,
+    'Outros': 0.02
+}
+
+# Faixas de risco: limite superior (inclusivo) de cada faixa, exceto a última
+LIMITES_RISCO = [0.1, 0.3, 0.5, 0.7]
+FAIXAS_RISCO = ["Baixo", "Médio-Baixo", "Médio", "Médio-Alto", "Alto"]
+CORES_RISCO = ["#10B981", "#84CC16", "#F59E0B", "#EF4444", "#DC2626"]
+
 def calculate_roi(volume_mensal, taxa_juros, taxa_inadimplencia_atual, reducao_inadimplencia, 
                   investimento_inicial=500000, meses=12):
     """
     Calcula ROI baseado nos parâmetros de negócio
     
+    Todos os argumentos aceitam escalares ou arrays NumPy, combinados por
+    broadcasting: uma grade de sensibilidade inteira sai de uma única chamada
+    (ex.: reduções em linha e taxas de inadimplência em coluna).
+    
     Args:
         volume_mensal: Volume de empréstimos por mês em R$
         taxa_juros: Taxa de juros mensal em %
@@ -16,9 +45,15 @@ def calculate_roi(volume_mensal, taxa_juros, taxa_inadimplencia_atual, reducao_i
         meses: Período de análise em meses
     
     Returns:
-        dict: Métricas de ROI calculadas
+        dict: Métricas de ROI calculadas, com o formato do broadcasting dos
+        argumentos (escalares NumPy quando todos os argumentos são escalares)
     """
     
+    volume_mensal, taxa_juros, taxa_inadimplencia_atual, reducao_inadimplencia, investimento_inicial, meses = \
+        np.broadcast_arrays(*(np.asarray(arg, dtype=np.float64) for arg in (
+            volume_mensal, taxa_juros, taxa_inadimplencia_atual, reducao_inadimplencia, investimento_inicial, meses
+        )))
+    
     # Convertendo percentuais
     taxa_juros = taxa_juros / 100
     taxa_inad_atual = taxa_inadimplencia_atual / 100
@@ -40,21 +75,58 @@ def calculate_roi(volume_mensal, taxa_juros, taxa_inadimplencia_atual, reducao_i
     # ROI
     roi_percentual = ((economia_total - investimento_inicial) / investimento_inicial) * 100
     
-    # Payback em meses
+    # Payback em meses (infinito quando não há economia)
     economia_mensal = economia_total / meses
-    payback_meses = investimento_inicial / economia_mensal if economia_mensal > 0 else float('inf')
+    payback_meses = np.divide(investimento_inicial, economia_mensal,
+                              out=np.full(economia_mensal.shape, np.inf), where=economia_mensal > 0)
     
+    # [()] devolve escalares NumPy para entradas escalares e os próprios arrays nos demais casos
     return {
-        'volume_total': volume_total,
-        'perdas_atuais': perdas_atuais,
-        'perdas_com_modelo': perdas_com_modelo,
-        'economia_total': economia_total,
-        'economia_mensal': economia_mensal,
-        'roi_percentual': roi_percentual,
-        'payback_meses': payback_meses,
-        'nova_taxa_inadimplencia': nova_taxa_inad * 100
+        'volume_total': volume_total[()],
+        'perdas_atuais': perdas_atuais[()],
+        'perdas_com_modelo': perdas_com_modelo[()],
+        'economia_total': economia_total[()],
+        'economia_mensal': economia_mensal[()],
+        'roi_percentual': roi_percentual[()],
+        'payback_meses': payback_meses[()],
+        'nova_taxa_inadimplencia': (nova_taxa_inad * 100)[()]
     }
 
+def calculate_roi_timeline(volume_mensal, taxa_juros, taxa_inadimplencia_atual, reducao_inadimplencia,
+                           investimento_inicial=500000, meses=12):
+    """
+    ROI acumulado mês a mês para vários cenários em uma única chamada
+    
+    Os parâmetros de cenário são vetores (um valor por cenário) e o mês é o
+    segundo eixo, de modo que calculate_roi avalia a grade cenários x meses por
+    broadcasting.
+    
+    Args:
+        volume_mensal: Volume mensal de cada cenário em R$
+        taxa_juros: Taxa de juros mensal de cada cenário em %
+        taxa_inadimplencia_atual: Inadimplência atual de cada cenário em %
+        reducao_inadimplencia: Redução esperada de cada cenário em %
+        investimento_inicial: Investimento (escalar ou um por cenário)
+        meses: Horizonte em meses
+    
+    Returns:
+        tuple: (meses 1..meses, matriz cenários x meses de ROI em %, limitado a -100%)
+    """
+    
+    coluna = lambda valores: np.atleast_1d(np.asarray(valores, dtype=np.float64))[:, None]
+    horizonte = np.arange(1, meses + 1)
+    
+    roi = calculate_roi(
+        volume_mensal=coluna(volume_mensal),
+        taxa_juros=coluna(taxa_juros),
+        taxa_inadimplencia_atual=coluna(taxa_inadimplencia_atual),
+        reducao_inadimplencia=coluna(reducao_inadimplencia),
+        investimento_inicial=coluna(investimento_inicial),
+        meses=horizonte[None, :]
+    )['roi_percentual']
+    
+    return horizonte, np.maximum(roi, -100)
+
 def calculate_business_impact(modelo_atual_auc=0.6753, novo_modelo_auc=0.7163, 
                              carteira_valor=100_000_000):
     """
@@ -125,13 +197,7 @@ def simulate_credit_risk(idade, renda_mensal, valor_emprestimo, historico_credit
         score += 0.1
     
     # Ajuste por histórico de crédito (variável mais importante)
-    historico_map = {
-        'Excelente': -0.2,
-        'Bom': -0.1,
-        'Regular': 0.05,
-        'Ruim': 0.25
-    }
-    score += historico_map.get(historico_credito, 0)
+    score += HISTORICO_AJUSTES.get(historico_credito, 0)
     
     # Ajuste por relação empréstimo/renda
     relacao_emprestimo_renda = valor_emprestimo / (renda_mensal * 12)
@@ -143,38 +209,17 @@ def simulate_credit_risk(idade, renda_mensal, valor_emprestimo, historico_credit
         score -= 0.05
     
     # Ajuste por finalidade
-    finalidade_map = {
-        'Compra de veículo': -0.02,
-        'Reforma/construção': -0.01,
-        'Consolidação de dívidas': 0.05,
-        'Capital de giro': 0.03,
-        'Outros': 0.02
-    }
-    score += finalidade_map.get(finalidade_emprestimo, 0)
+    score += FINALIDADE_AJUSTES.get(finalidade_emprestimo, 0)
     
     # Garantindo que score esteja entre 0 e 1
     score = max(0, min(1, score))
     
     # Determinando decisão com base no threshold otimizado (0.0922)
-    threshold = 0.0922
+    threshold = THRESHOLD_MODELO
     aprovado = score <= threshold
     
     # Classificação de risco
-    if score <= 0.1:
-        risco = "Baixo"
-        cor_risco = "#10B981"
-    elif score <= 0.3:
-        risco = "Médio-Baixo"
-        cor_risco = "#84CC16"
-    elif score <= 0.5:
-        risco = "Médio"
-        cor_risco = "#F59E0B"
-    elif score <= 0.7:
-        risco = "Médio-Alto"
-        cor_risco = "#EF4444"
-    else:
-        risco = "Alto"
-        cor_risco = "#DC2626"
+    risco, cor_risco = classify_risk(score)
     
     return {
         'score': score,
@@ -186,6 +231,132 @@ def simulate_credit_risk(idade, renda_mensal, valor_emprestimo, historico_credit
                                           historico_credito, relacao_emprestimo_renda)
     }
 
+def classify_risk(score):
+    """
+    Classifica o score em faixa de risco
+    
+    Args:
+        score: Score de risco entre 0 e 1
+    
+    Returns:
+        tuple: (classificação de risco, cor da classificação)
+    """
+    
+    faixa = bisect_left(LIMITES_RISCO, score)
+    return FAIXAS_RISCO[faixa], CORES_RISCO[faixa]
+
+def _category_codes(valores, categorias):
+    """Códigos categóricos na ordem de categorias; valores desconhecidos recebem -1"""
+    return pd.Categorical(valores, categories=list(categorias)).codes
+
+def _adjustment_lookup(ajustes):
+    """Tabela de ajustes indexada por código; o código -1 (desconhecido) cai no 0.0 final"""
+    return np.append(np.array(list(ajustes.values())), 0.0)
+
+def _rule_score(idade, renda_mensal, valor_emprestimo, historico, finalidade):
+    """
+    Score do simulador com broadcasting entre as entradas (mesma ordem de soma do escalar)
+    
+    historico e finalidade são códigos de _category_codes.
+    
+    Returns:
+        tuple: (score, faixa etária de menor risco, relação empréstimo/renda anual)
+    """
+    
+    faixa_etaria = (idade >= 25) & (idade <= 55)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        relacao_emprestimo_renda = valor_emprestimo / (renda_mensal * 12)
+    
+    score = 0.5 + np.where(faixa_etaria, -0.1, 0.05)
+    score = score + np.select([renda_mensal >= 10000, renda_mensal >= 5000], [-0.15, -0.05], 0.1)
+    score = score + _adjustment_lookup(HISTORICO_AJUSTES)[historico]
+    score = score + np.select(
+        [relacao_emprestimo_renda > 5, relacao_emprestimo_renda > 3, relacao_emprestimo_renda < 1],
+        [0.2, 0.1, -0.05],
+        0.0
+    )
+    score = score + _adjustment_lookup(FINALIDADE_AJUSTES)[finalidade]
+    return np.clip(score, 0, 1), faixa_etaria, relacao_emprestimo_renda
+
+def simulate_credit_risk_batch(perfis):
+    """
+    Versão vetorizada de simulate_credit_risk para muitos solicitantes
+    
+    Aplica os mesmos ajustes na mesma ordem de soma, então cada linha tem
+    exatamente o resultado da função escalar. Colunas de texto são convertidas
+    uma única vez em códigos categóricos, e as saídas de texto voltam como
+    Categorical.
+    
+    Args:
+        perfis: DataFrame (ou dict de arrays) com idade, renda_mensal,
+            valor_emprestimo, historico_credito e finalidade_emprestimo
+    
+    Returns:
+        DataFrame: score, aprovado, classificacao_risco, cor_risco, confianca e motivo_principal
+    """
+    
+    historico = _category_codes(perfis['historico_credito'], HISTORICO_AJUSTES)
+    renda_mensal = np.asarray(perfis['renda_mensal'], dtype=np.float64)
+    score, faixa_etaria, relacao_emprestimo_renda = _rule_score(
+        np.asarray(perfis['idade']),
+        renda_mensal,
+        np.asarray(perfis['valor_emprestimo'], dtype=np.float64),
+        historico,
+        _category_codes(perfis['finalidade_emprestimo'], FINALIDADE_AJUSTES)
+    )
+    
+    threshold = THRESHOLD_MODELO
+    faixa = np.searchsorted(LIMITES_RISCO, score, side='left')
+    
+    # Mesma prioridade de get_main_reason: o primeiro motivo aplicável vence
+    codigo_historico = {nome: codigo for codigo, nome in enumerate(HISTORICO_AJUSTES)}
+    motivos = [
+        (np.isin(historico, [codigo_historico['Excelente'], codigo_historico['Bom']]),
+         "Histórico de crédito positivo"),
+        (historico == codigo_historico['Ruim'], "Histórico de crédito negativo"),
+        (renda_mensal >= 10000, "Renda mensal elevada"),
+        (renda_mensal < 3000, "Renda mensal baixa"),
+        (relacao_emprestimo_renda > 5, "Valor do empréstimo muito alto em relação à renda"),
+        (relacao_emprestimo_renda < 1, "Valor do empréstimo adequado à renda"),
+        (faixa_etaria, "Faixa etária de menor risco")
+    ]
+    motivo = np.select([condicao for condicao, _ in motivos], np.arange(len(motivos)), len(motivos))
+    
+    return pd.DataFrame({
+        'score': score,
+        'aprovado': score <= threshold,
+        'classificacao_risco': pd.Categorical.from_codes(faixa, FAIXAS_RISCO),
+        'cor_risco': pd.Categorical.from_codes(faixa, CORES_RISCO),
+        'confianca': np.minimum(95, 70 + (np.abs(score - threshold) * 100)),
+        'motivo_principal': pd.Categorical.from_codes(
+            motivo, [texto for _, texto in motivos] + ["Perfil geral do solicitante"]
+        )
+    })
+
+def simulate_score_surface(idade, historico_credito, finalidade_emprestimo, rendas, valores):
+    """
+    Scores do simulador em uma grade renda x valor do empréstimo, em uma única passada
+    
+    Args:
+        idade: Idade fixa do solicitante
+        historico_credito: Histórico de crédito fixo
+        finalidade_emprestimo: Finalidade fixa
+        rendas: Valores de renda mensal (eixo x)
+        valores: Valores de empréstimo (eixo y)
+    
+    Returns:
+        np.ndarray: Matriz len(valores) x len(rendas) de scores
+    """
+    
+    score, _, _ = _rule_score(
+        np.asarray(idade),
+        np.asarray(rendas, dtype=np.float64)[None, :],
+        np.asarray(valores, dtype=np.float64)[:, None],
+        _category_codes([historico_credito], HISTORICO_AJUSTES)[0],
+        _category_codes([finalidade_emprestimo], FINALIDADE_AJUSTES)[0]
+    )
+    return score
+
 def get_main_reason(idade, renda_mensal, valor_emprestimo, historico_credito, relacao_emprestimo_renda):
     """Determina o principal motivo para a decisão"""
     
@@ -219,10 +390,20 @@ def format_percentage(value):
     """Formata porcentagem"""
     return f"{value:.1f}%"
 
+def _safe_ratio(numerador, denominador):
+    """Divisão elemento a elemento que retorna 0 onde o denominador é 0"""
+    
+    numerador, denominador = np.broadcast_arrays(np.asarray(numerador, dtype=np.float64),
+                                                 np.asarray(denominador, dtype=np.float64))
+    resultado = np.divide(numerador, denominador, out=np.zeros(numerador.shape), where=denominador > 0)
+    return resultado[()]
+
 def calculate_model_metrics(tp, tn, fp, fn):
     """
     Calcula métricas do modelo a partir da matriz de confusão
     
+    Aceita escalares ou arrays NumPy (ex.: contagens de várias reamostragens)
+    
     Args:
         tp: Verdadeiros positivos
         tn: Verdadeiros negativos  
@@ -235,11 +416,11 @@ def calculate_model_metrics(tp, tn, fp, fn):
     
     total = tp + tn + fp + fn
     
-    accuracy = (tp + tn) / total
-    precision = tp / (tp + fp) if (tp + fp) > 0 else 0
-    recall = tp / (tp + fn) if (tp + fn) > 0 else 0
-    specificity = tn / (tn + fp) if (tn + fp) > 0 else 0
-    f1_score = 2 * (precision * recall) / (precision + recall) if (precision + recall) > 0 else 0
+    accuracy = _safe_ratio(tp + tn, total)
+    precision = _safe_ratio(tp, tp + fp)
+    recall = _safe_ratio(tp, tp + fn)
+    specificity = _safe_ratio(tn, tn + fp)
+    f1_score = _safe_ratio(2 * (precision * recall), precision + recall)
     
     return {
         'accuracy': accuracy,
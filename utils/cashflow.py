@@ -0,0 +1,211 @@
+import numpy as np
+
+# Prazo padrão dos empréstimos em meses
+PRAZO_PADRAO = 12
+
+# Perda dada a inadimplência: fração do saldo devedor não recuperada
+LGD_PADRAO = 0.6
+
+# Safras por mês de originação (1 = mensais, 30 = diárias)
+SAFRAS_POR_MES = 1
+
+def price_schedule(taxa_juros, prazo=PRAZO_PADRAO):
+    """
+    Tabela Price de um empréstimo de valor 1
+
+    Args:
+        taxa_juros: Taxa de juros mensal em % (escalar ou array)
+        prazo: Número de parcelas
+
+    Returns:
+        tuple: (saldo devedor após k parcelas, k = 0..prazo, com formato
+        taxa_juros.shape + (prazo + 1,); parcela, com formato taxa_juros.shape + (1,))
+    """
+
+    taxa = np.asarray(taxa_juros, dtype=np.float64)[..., None] / 100
+    k = np.arange(prazo + 1)
+
+    # Taxa zero: amortização linear (limite da fórmula Price)
+    sem_juros = taxa == 0
+    taxa_segura = np.where(sem_juros, 1.0, taxa)
+    fator = (1 + taxa_segura) ** prazo
+    saldo = np.where(sem_juros, 1 - k / prazo, (fator - (1 + taxa_segura) ** k) / (fator - 1))
+    parcela = np.where(sem_juros, 1 / prazo, taxa_segura * fator / (fator - 1))
+    return saldo, parcela
+
+def installment_calendar(prazo, meses, horizonte, safras_por_mes=SAFRAS_POR_MES):
+    """
+    Quantas safras pagam a k-ésima parcela em cada mês do calendário
+
+    A safra c é originada em c / safras_por_mes meses e sua parcela k vence em
+    c / safras_por_mes + k; a parcela entra no mês do calendário em que vence.
+
+    Args:
+        prazo: Número de parcelas
+        meses: Meses de originação
+        horizonte: Meses do calendário considerados
+        safras_por_mes: Safras originadas por mês
+
+    Returns:
+        np.ndarray: Matriz prazo x horizonte de contagens de safras
+    """
+
+    originacao = np.arange(meses * safras_por_mes) / safras_por_mes
+    mes_vencimento = np.floor(originacao[:, None] + np.arange(1, prazo + 1)[None, :]).astype(np.int64)
+    parcela = np.broadcast_to(np.arange(prazo), mes_vencimento.shape)
+
+    dentro = mes_vencimento < horizonte
+    return np.bincount(parcela[dentro] * horizonte + mes_vencimento[dentro],
+                       minlength=prazo * horizonte).reshape(prazo, horizonte).astype(np.float64)
+
+def cohort_cashflows(volume_mensal, taxa_juros, taxa_inadimplencia, prazo=PRAZO_PADRAO, meses=12,
+                     horizonte=None, lgd=LGD_PADRAO, safras_por_mes=SAFRAS_POR_MES):
+    """
+    Fluxos de caixa das safras de originação com amortização Price e inadimplência por mês de vida
+
+    A inadimplência acumulada na vida do empréstimo (taxa_inadimplencia) vira um
+    hazard mensal constante h = 1 - (1 - PD)^(1 / prazo). No mês de vida k, a
+    fração S(k-1) * h dos contratos entra em default: deixa de pagar a parcela,
+    recupera (1 - lgd) do saldo e perde lgd. Os adimplentes, S(k), pagam juros
+    sobre o saldo e amortizam o restante da parcela.
+
+    Os argumentos de cenário (volume, juros, inadimplência, lgd) aceitam arrays
+    e são combinados por broadcasting; as saídas ganham as dimensões dos
+    cenários à esquerda.
+
+    Args:
+        volume_mensal: Volume originado por mês em R$
+        taxa_juros: Taxa de juros mensal em %
+        taxa_inadimplencia: Inadimplência acumulada na vida do empréstimo em %
+        prazo: Número de parcelas
+        meses: Meses de originação
+        horizonte: Meses do calendário considerados (padrão: meses + prazo, carteira liquidada)
+        lgd: Perda dada a inadimplência (0 a 1)
+        safras_por_mes: Safras originadas por mês (30 para safras diárias)
+
+    Returns:
+        dict: Por safra (matrizes safra x mês de vida): juros_safra, amortizacao_safra,
+        recuperacao_safra e perdas_safra. No calendário (cenários x horizonte): juros,
+        amortizacao, recuperacao, perdas e desembolso.
+    """
+
+    horizonte = meses + prazo if horizonte is None else horizonte
+    volume_mensal, taxa_juros, taxa_inadimplencia, lgd = np.broadcast_arrays(
+        *(np.asarray(arg, dtype=np.float64) for arg in (volume_mensal, taxa_juros, taxa_inadimplencia, lgd))
+    )
+
+    saldo, parcela = price_schedule(taxa_juros, prazo)
+    saldo_anterior = saldo[..., :-1]
+    taxa = taxa_juros[..., None] / 100
+
+    # Sobrevivência (contratos adimplentes) antes e depois de cada mês de vida
+    hazard = 1 - (1 - np.clip(taxa_inadimplencia[..., None] / 100, 0.0, 1.0)) ** (1 / prazo)
+    k = np.arange(1, prazo + 1)
+    sobrevivencia_anterior = (1 - hazard) ** (k - 1)
+    sobrevivencia = sobrevivencia_anterior * (1 - hazard)
+
+    # Fluxos por unidade originada e por mês de vida
+    principal = (volume_mensal / safras_por_mes)[..., None]
+    juros = principal * sobrevivencia * taxa * saldo_anterior
+    amortizacao = principal * sobrevivencia * (parcela - taxa * saldo_anterior)
+    saldo_inadimplido = principal * sobrevivencia_anterior * hazard * saldo_anterior
+    perdas = lgd[..., None] * saldo_inadimplido
+    recuperacao = saldo_inadimplido - perdas
+
+    # Todas as safras têm o mesmo cronograma; o calendário só muda o mês de cada parcela
+    calendario = installment_calendar(prazo, meses, horizonte, safras_por_mes)
+    n_safras = meses * safras_por_mes
+    por_safra = lambda fluxo: np.broadcast_to(fluxo[..., None, :], fluxo.shape[:-1] + (n_safras, prazo))
+
+    desembolso = np.zeros(volume_mensal.shape + (horizonte,))
+    desembolso[..., :min(meses, horizonte)] = volume_mensal[..., None]
+
+    return {
+        'juros_safra': por_safra(juros),
+        'amortizacao_safra': por_safra(amortizacao),
+        'recuperacao_safra': por_safra(recuperacao),
+        'perdas_safra': por_safra(perdas),
+        'juros': juros @ calendario,
+        'amortizacao': amortizacao @ calendario,
+        'recuperacao': recuperacao @ calendario,
+        'perdas': perdas @ calendario,
+        'desembolso': desembolso
+    }
+
+def payback_from_cashflow(economia_por_mes, investimento):
+    """
+    Meses até a economia acumulada cobrir o investimento (interpolado dentro do mês)
+
+    Args:
+        economia_por_mes: Economia de cada mês (cenários x meses)
+        investimento: Investimento inicial (broadcastable com os cenários)
+
+    Returns:
+        np.ndarray: Payback em meses; infinito quando não ocorre no horizonte
+    """
+
+    investimento = np.asarray(investimento, dtype=np.float64)
+    acumulada = np.cumsum(economia_por_mes, axis=-1)
+    cobre = acumulada >= investimento[..., None]
+    mes = np.argmax(cobre, axis=-1)
+
+    anterior = np.where(mes > 0, np.take_along_axis(acumulada, np.maximum(mes - 1, 0)[..., None], -1)[..., 0], 0.0)
+    no_mes = np.take_along_axis(economia_por_mes, mes[..., None], -1)[..., 0]
+    fracao = np.divide(investimento - anterior, no_mes, out=np.ones_like(no_mes), where=no_mes > 0)
+    return np.where(cobre.any(axis=-1), mes + np.clip(fracao, 0.0, 1.0), np.inf)
+
+def calculate_roi_cashflow(volume_mensal, taxa_juros, taxa_inadimplencia_atual, reducao_inadimplencia,
+                           investimento_inicial=500000, meses=12, prazo=PRAZO_PADRAO, lgd=LGD_PADRAO,
+                           safras_por_mes=SAFRAS_POR_MES, horizonte=None):
+    """
+    ROI do modelo a partir dos fluxos de caixa das safras
+
+    Compara a carteira com a inadimplência atual e com a reduzida pelo modelo:
+    a economia de cada mês é o ganho no resultado de crédito (juros recebidos
+    menos perdas), que inclui os juros pagos pelos contratos que deixam de
+    inadimplir. Os argumentos de cenário aceitam arrays (broadcasting).
+
+    Args:
+        volume_mensal: Volume originado por mês em R$
+        taxa_juros: Taxa de juros mensal em %
+        taxa_inadimplencia_atual: Inadimplência acumulada atual em %
+        reducao_inadimplencia: Redução esperada na inadimplência em %
+        investimento_inicial: Custo de implementação do modelo
+        meses: Meses de originação
+        prazo: Número de parcelas
+        lgd: Perda dada a inadimplência (0 a 1)
+        safras_por_mes: Safras originadas por mês
+        horizonte: Meses considerados (padrão: meses + prazo)
+
+    Returns:
+        dict: Mesmas chaves de calculate_roi (economia_mensal = média no horizonte),
+        mais juros_atuais, juros_com_modelo e economia_por_mes (cenários x horizonte)
+    """
+
+    volume_mensal, taxa_juros, taxa_inadimplencia_atual, reducao_inadimplencia, investimento_inicial = \
+        np.broadcast_arrays(*(np.asarray(arg, dtype=np.float64) for arg in (
+            volume_mensal, taxa_juros, taxa_inadimplencia_atual, reducao_inadimplencia, investimento_inicial
+        )))
+    nova_taxa_inad = taxa_inadimplencia_atual * (1 - reducao_inadimplencia / 100)
+
+    atual = cohort_cashflows(volume_mensal, taxa_juros, taxa_inadimplencia_atual, prazo, meses,
+                             horizonte, lgd, safras_por_mes)
+    modelo = cohort_cashflows(volume_mensal, taxa_juros, nova_taxa_inad, prazo, meses,
+                              horizonte, lgd, safras_por_mes)
+
+    economia_por_mes = (modelo['juros'] - modelo['perdas']) - (atual['juros'] - atual['perdas'])
+    economia_total = economia_por_mes.sum(axis=-1)
+
+    return {
+        'volume_total': (volume_mensal * meses)[()],
+        'perdas_atuais': atual['perdas'].sum(axis=-1)[()],
+        'perdas_com_modelo': modelo['perdas'].sum(axis=-1)[()],
+        'juros_atuais': atual['juros'].sum(axis=-1)[()],
+        'juros_com_modelo': modelo['juros'].sum(axis=-1)[()],
+        'economia_total': economia_total[()],
+        'economia_mensal': (economia_total / economia_por_mes.shape[-1])[()],
+        'economia_por_mes': economia_por_mes,
+        'roi_percentual': ((economia_total - investimento_inicial) / investimento_inicial * 100)[()],
+        'payback_meses': payback_from_cashflow(economia_por_mes, investimento_inicial)[()],
+        'nova_taxa_inadimplencia': nova_taxa_inad[()]
+    }
@@ -5,6 +5,9 @@ from plotly.subplots import make_subplots
 import pandas as pd
 import numpy as np
 
+from utils.calculations import calculate_roi_timeline
+from utils.evaluation import lttb_downsample
+
 # Cores da Power of Data
 COLORS = {
     'primary': '#1E3A8A',
@@ -80,8 +83,8 @@ def create_confusion_matrix(cm_data):
     
     return fig
 
-def create_feature_importance(features_df):
-    """Cria gráfico de importância das variáveis"""
+def create_feature_importance(features_df, top_n=10):
+    """Cria gráfico de importância das top_n variáveis"""
     
     # Cores por categoria
     color_map = {
@@ -90,10 +93,12 @@ def create_feature_importance(features_df):
         'Capacidade Pagamento': COLORS['warning'],
         'Utilização Crédito': COLORS['light_blue'],
         'Consultas Recentes': COLORS['secondary'],
-        'Dados Demográficos': '#8B5CF6'
+        'Dados Demográficos': '#8B5CF6',
+        'Datas e Recência': '#EC4899'
     }
     
-    colors = [color_map[cat] for cat in features_df['Category']]
+    features_df = features_df.nlargest(top_n, 'Importance')
+    colors = [color_map.get(cat, '#9CA3AF') for cat in features_df['Category']]
     
     fig = go.Figure(go.Bar(
         x=features_df['Importance'],
@@ -108,7 +113,7 @@ def create_feature_importance(features_df):
     
     fig.update_layout(
         title={
-            'text': 'Top 10 Variáveis Mais Importantes',
+            'text': f'Top {top_n} Variáveis Mais Importantes',
             'x': 0.5,
             'font': {'size': 18, 'color': COLORS['primary']}
         },
@@ -121,28 +126,26 @@ def create_feature_importance(features_df):
     
     return fig
 
-def create_roc_curve():
-    """Cria curva ROC"""
-    
-    # Simulando curva ROC baseada no AUC 0.7163
-    np.random.seed(42)
-    n_points = 100
-    
-    # Gerando pontos da curva ROC
-    fpr = np.linspace(0, 1, n_points)
+def _simulated_roc_curve():
+    """Curva ROC aproximada a partir do AUC 0.7163 do relatório"""
+    
+    fpr = np.linspace(0, 1, 100)
+    tpr = np.select(
+        [fpr < 0.1, fpr < 0.5],
+        [fpr * 2.5, 0.25 + (fpr - 0.1) * 1.5],
+        0.85 + (fpr - 0.5) * 0.3
+    )
     
-    # Simulando TPR baseado no AUC conhecido
-    tpr = []
-    for fp in fpr:
-        if fp < 0.1:
-            tp = fp * 2.5  # Início mais íngreme
-        elif fp < 0.5:
-            tp = 0.25 + (fp - 0.1) * 1.5
-        else:
-            tp = 0.85 + (fp - 0.5) * 0.3
-        tpr.append(min(tp, 1.0))
+    return fpr, np.minimum(tpr, 1.0)
+
+def create_roc_curve(fpr=None, tpr=None, auc=0.7163, max_points=2000):
+    """Cria curva ROC a partir de scores reais (fpr, tpr) ou, sem eles, a curva simulada do relatório"""
     
-    tpr = np.array(tpr)
+    if fpr is None:
+        fpr, tpr = _simulated_roc_curve()
+    else:
+        # Redução com preservação de forma: milhões de thresholds viram poucos milhares de pontos
+        fpr, tpr = lttb_downsample(fpr, tpr, max_points)
     
     fig = go.Figure()
     
@@ -150,7 +153,7 @@ def create_roc_curve():
     fig.add_trace(go.Scatter(
         x=fpr, y=tpr,
         mode='lines',
-        name=f'LightGBM + SMOTE (AUC = 0.7163)',
+        name=f'LightGBM + SMOTE (AUC = {auc:.4f})',
         line=dict(color=COLORS['primary'], width=3)
     ))
     
@@ -188,22 +191,101 @@ def create_roc_curve():
     
     return fig
 
-def create_portfolio_distribution(portfolio_df):
-    """Cria gráfico de distribuição de risco da carteira"""
+def create_pr_curve(recall, precision, average_precision, base_rate, max_points=2000):
+    """Cria curva precision-recall a partir de scores reais"""
     
-    risk_counts = portfolio_df['risk_category'].value_counts()
+    recall, precision = lttb_downsample(recall, precision, max_points)
     
-    colors_map = {
-        'Baixo Risco': COLORS['success'],
-        'Médio Risco': COLORS['warning'], 
-        'Alto Risco': '#EF4444'
-    }
+    fig = go.Figure()
+    
+    fig.add_trace(go.Scatter(
+        x=recall, y=precision,
+        mode='lines',
+        name=f'LightGBM + SMOTE (AP = {average_precision:.4f})',
+        line=dict(color=COLORS['primary'], width=3)
+    ))
+    
+    # Precision de um classificador aleatório = taxa de inadimplentes
+    fig.add_hline(y=base_rate, line_dash="dash", line_color=COLORS['secondary'],
+                  annotation_text=f"Aleatório ({base_rate:.2%})")
+    
+    fig.update_layout(
+        title={
+            'text': 'Curva Precision-Recall - Modelo LightGBM + SMOTE',
+            'x': 0.5,
+            'font': {'size': 18, 'color': COLORS['primary']}
+        },
+        xaxis_title='Recall (Inadimplentes Detectados)',
+        yaxis_title='Precision',
+        template='plotly_white',
+        height=500,
+        legend=dict(x=0.4, y=0.95)
+    )
+    
+    return fig
+
+def create_profit_curve(thresholds, lucro, threshold_otimo, threshold_atual=None, max_points=2000):
+    """
+    Lucro esperado por solicitante em função do threshold de decisão
+    
+    Args:
+        thresholds: Thresholds avaliados (crescentes)
+        lucro: Lucro por solicitante em R$ em cada threshold
+        threshold_otimo: Threshold de maior lucro (linha de destaque)
+        threshold_atual: Threshold em uso (linha de referência opcional)
+        max_points: Pontos enviados ao navegador
+    """
     
-    colors = [colors_map[cat] for cat in risk_counts.index]
+    thresholds, lucro = lttb_downsample(thresholds, lucro, max_points)
+    
+    fig = go.Figure()
+    
+    fig.add_trace(go.Scatter(
+        x=thresholds, y=lucro,
+        mode='lines',
+        name='Lucro por solicitante',
+        line=dict(color=COLORS['primary'], width=3),
+        hovertemplate='Threshold: %{x:.4f}<br>Lucro: R$ %{y:,.2f}<extra></extra>'
+    ))
+    
+    fig.add_vline(x=threshold_otimo, line_dash="dash", line_color=COLORS['success'],
+                  annotation_text=f"Ótimo ({threshold_otimo:.4f})")
+    if threshold_atual is not None:
+        fig.add_vline(x=threshold_atual, line_dash="dot", line_color='#EF4444',
+                      annotation_text=f"Atual ({threshold_atual:.4f})", annotation_position="bottom right")
+    fig.add_hline(y=0, line_color=COLORS['secondary'], line_width=1)
+    
+    fig.update_layout(
+        title={
+            'text': 'Lucro Esperado por Threshold',
+            'x': 0.5,
+            'font': {'size': 18, 'color': COLORS['primary']}
+        },
+        xaxis_title='Threshold (score a partir do qual o cliente é recusado)',
+        yaxis_title='Lucro por Solicitante (R$)',
+        template='plotly_white',
+        height=450,
+        showlegend=False
+    )
+    
+    return fig
+
+# Cores das faixas de risco da carteira
+PORTFOLIO_RISK_COLORS = {
+    'Baixo Risco': COLORS['success'],
+    'Médio Risco': COLORS['warning'], 
+    'Alto Risco': '#EF4444'
+}
+
+def create_portfolio_distribution(risk_summary):
+    """Cria gráfico de distribuição de risco da carteira a partir de category_summary"""
+    
+    colors = [PORTFOLIO_RISK_COLORS.get(cat, '#9CA3AF') for cat in risk_summary['category']]
     
     fig = go.Figure(data=[go.Pie(
-        labels=risk_counts.index,
-        values=risk_counts.values,
+        labels=risk_summary['category'],
+        values=risk_summary['count'],
+        sort=False,
         hole=0.3,
         marker_colors=colors,
         textinfo='label+percent',
@@ -224,44 +306,181 @@ def create_portfolio_distribution(portfolio_df):
     
     return fig
 
-def create_roi_timeline(scenarios):
-    """Cria timeline de ROI para diferentes cenários"""
+def create_distribution_histogram(summary, title, xaxis_title, color=None, tickformat=None, count_label='Clientes'):
+    """
+    Histograma a partir de um resumo pré-agregado (histogram_summary)
+    
+    Args:
+        summary: DataFrame com bin_start, bin_end e count
+        title: Título do gráfico
+        xaxis_title: Título do eixo x
+        color: Cor das barras
+        tickformat: Formato dos ticks do eixo x (ex.: ',.0f')
+        count_label: O que é contado em cada bin (eixo y e hover)
+    """
+    
+    fig = go.Figure(go.Bar(
+        x=(summary['bin_start'] + summary['bin_end']) / 2,
+        y=summary['count'],
+        width=summary['bin_end'] - summary['bin_start'],
+        marker_color=color or COLORS['secondary'],
+        customdata=summary[['bin_start', 'bin_end']],
+        hovertemplate='%{customdata[0]:,.2f} – %{customdata[1]:,.2f}<br>' + count_label + ': %{y:,}<extra></extra>'
+    ))
+    
+    fig.update_layout(
+        title={
+            'text': title,
+            'x': 0.5,
+            'font': {'size': 16, 'color': COLORS['primary']}
+        },
+        xaxis_title=xaxis_title,
+        yaxis_title=count_label,
+        xaxis={'tickformat': tickformat} if tickformat else {},
+        template='plotly_white',
+        height=350,
+        bargap=0
+    )
+    
+    return fig
+
+def create_simulation_distribution(summary, percentis, title, xaxis_title, color=None, tickformat=None):
+    """
+    Histograma de uma simulação (pré-agregado) com linhas verticais nos percentis
+    
+    Args:
+        summary: DataFrame com bin_start, bin_end e count
+        percentis: Dicionário rótulo -> valor (ex.: {'P5': ..., 'P50': ..., 'P95': ...})
+        title: Título do gráfico
+        xaxis_title: Título do eixo x
+        color: Cor das barras
+        tickformat: Formato dos ticks do eixo x
+    """
+    
+    fig = create_distribution_histogram(summary, title, xaxis_title, color, tickformat, count_label='Simulações')
+    
+    for label, value in percentis.items():
+        if np.isfinite(value):
+            fig.add_vline(x=value, line_dash='dash', line_color=COLORS['primary'],
+                          annotation_text=label, annotation_position='top')
+    
+    return fig
+
+def create_portfolio_scatter(sample):
+    """Dispersão renda x valor do empréstimo por faixa de risco (WebGL, sobre uma amostra)"""
+    
+    fig = go.Figure()
+    
+    for category, color in PORTFOLIO_RISK_COLORS.items():
+        subset = sample[sample['risk_category'] == category]
+        fig.add_trace(go.Scattergl(
+            x=subset['monthly_income'],
+            y=subset['loan_amount'],
+            mode='markers',
+            name=category,
+            marker={'color': color, 'size': 4, 'opacity': 0.5},
+            hovertemplate='Renda: R$ %{x:,.0f}<br>Empréstimo: R$ %{y:,.0f}<extra></extra>'
+        ))
+    
+    fig.update_layout(
+        title={
+            'text': f'Renda x Valor do Empréstimo (amostra de {len(sample):,} clientes)'.replace(',', '.'),
+            'x': 0.5,
+            'font': {'size': 16, 'color': COLORS['primary']}
+        },
+        xaxis_title='Renda Mensal (R$)',
+        yaxis_title='Valor do Empréstimo (R$)',
+        template='plotly_white',
+        height=450,
+        legend=dict(orientation="h", yanchor="bottom", y=-0.25, xanchor="center", x=0.5)
+    )
+    
+    return fig
+
+# Cenários desenhados como traços individuais (acima disso, um único traço WebGL)
+MAX_NAMED_SCENARIOS = 10
+
+# Pontos por cenário no gráfico de timeline
+MAX_TIMELINE_POINTS = 120
+
+# Pontos somados de todos os cenários (limita o payload enviado ao navegador)
+MAX_TIMELINE_VALUES = 20_000
+
+def create_roi_timeline(scenarios, investimento=500_000, meses=12, max_points=MAX_TIMELINE_POINTS):
+    """
+    Cria timeline de ROI para diferentes cenários
+    
+    O ROI de todos os cenários e meses é calculado de uma vez (calculate_roi_timeline).
+    Horizontes longos são dizimados para max_points meses por cenário, ou menos
+    quando há muitos cenários. A forma se mantém: o ROI sem limite parte de -100%
+    no mês zero e varia linearmente com o mês, então cada curva é uma reta ou,
+    com economia negativa, fica inteira no piso de -100%. Acima de
+    MAX_NAMED_SCENARIOS cenários, as curvas vão em um único traço Scattergl
+    separado por lacunas, com a mediana destacada.
+    
+    Args:
+        scenarios: DataFrame com um cenário por linha (roi_scenarios_frame ou
+            read_roi_scenarios)
+        investimento: Investimento inicial, usado quando o cenário não informa o seu
+        meses: Horizonte em meses
+        max_points: Máximo de meses desenhados por cenário
+    """
+    
+    investimentos = scenarios['investimento_inicial'] if 'investimento_inicial' in scenarios.columns else investimento
+    
+    months, roi = calculate_roi_timeline(
+        scenarios['volume_mensal'], scenarios['taxa_juros'], scenarios['taxa_inadimplencia_atual'],
+        scenarios['reducao_inadimplencia'], investimentos, meses
+    )
     
-    months = list(range(1, 13))
+    # Dizimação uniforme dos meses, mantendo o primeiro e o último
+    max_points = int(np.clip(MAX_TIMELINE_VALUES // max(len(scenarios), 1), 2, max_points))
+    if months.size > max_points:
+        keep = np.unique(np.linspace(0, months.size - 1, max_points).round().astype(np.int64))
+        months, roi = months[keep], roi[:, keep]
     
+    names = scenarios['cenario'].astype(str).to_numpy()
     fig = go.Figure()
     
-    colors_scenarios = [COLORS['success'], COLORS['warning'], COLORS['primary']]
-    
-    for i, (scenario_name, params) in enumerate(scenarios.items()):
-        # Simulando ROI acumulado ao longo do tempo
-        roi_values = []
-        for month in months:
-            volume_total = params['volume_mensal'] * month
-            reducao = params['reducao_inadimplencia'] / 100
-            taxa_inad = params['taxa_inadimplencia_atual'] / 100
-            
-            # Economia com redução de inadimplência
-            economia = volume_total * taxa_inad * reducao
-            
-            # ROI considerando investimento inicial
-            investimento = 500_000  # Investimento inicial estimado
-            roi = ((economia - investimento) / investimento) * 100
-            
-            roi_values.append(max(roi, -100))  # Limitando ROI mínimo
+    if len(scenarios) <= MAX_NAMED_SCENARIOS:
+        colors_scenarios = [COLORS['success'], COLORS['warning'], COLORS['primary'], COLORS['light_blue'],
+                            '#EF4444', '#8B5CF6', '#EC4899', '#14B8A6', '#F97316', COLORS['secondary']]
+        for i, name in enumerate(names):
+            fig.add_trace(go.Scatter(
+                x=months,
+                y=roi[i],
+                mode='lines+markers' if months.size <= 36 else 'lines',
+                name=f'Cenário {name}',
+                line=dict(color=colors_scenarios[i % len(colors_scenarios)], width=3),
+                marker=dict(size=8)
+            ))
+    else:
+        # Todas as curvas em um traço: NaN separa os cenários
+        n_scenarios, n_months = roi.shape
+        x = np.tile(np.append(months, np.nan), n_scenarios)
+        y = np.column_stack([roi, np.full(n_scenarios, np.nan)]).ravel()
+        text = np.repeat(names, n_months + 1)
         
+        fig.add_trace(go.Scattergl(
+            x=x,
+            y=y,
+            text=text,
+            mode='lines',
+            name=f'{n_scenarios} cenários',
+            line=dict(color='rgba(107, 114, 128, 0.25)', width=1),
+            hovertemplate='%{text}<br>Mês %{x}<br>ROI: %{y:,.1f}%<extra></extra>'
+        ))
         fig.add_trace(go.Scatter(
             x=months,
-            y=roi_values,
-            mode='lines+markers',
-            name=f'Cenário {scenario_name}',
-            line=dict(color=colors_scenarios[i], width=3),
-            marker=dict(size=8)
+            y=np.median(roi, axis=0),
+            mode='lines',
+            name='Mediana',
+            line=dict(color=COLORS['primary'], width=3)
         ))
     
     fig.update_layout(
         title={
-            'text': 'Projeção de ROI por Cenário (12 meses)',
+            'text': f'Projeção de ROI por Cenário ({meses} meses)',
             'x': 0.5,
             'font': {'size': 18, 'color': COLORS['primary']}
         },
@@ -278,6 +497,181 @@ def create_roi_timeline(scenarios):
     
     return fig
 
+def create_score_surface(rendas, valores, scores, threshold, renda_atual=None, valor_atual=None):
+    """
+    Mapa de calor do score em uma grade renda x valor do empréstimo
+    
+    Args:
+        rendas: Eixo x (renda mensal)
+        valores: Eixo y (valor do empréstimo)
+        scores: Matriz len(valores) x len(rendas)
+        threshold: Score máximo para aprovação; desenhado como fronteira
+        renda_atual: Renda do perfil analisado (marcador opcional)
+        valor_atual: Valor do perfil analisado (marcador opcional)
+    """
+    
+    fig = go.Figure(go.Heatmap(
+        x=rendas,
+        y=valores,
+        z=scores,
+        zmin=0,
+        zmax=1,
+        colorscale=[[0, COLORS['success']], [0.5, COLORS['warning']], [1, '#DC2626']],
+        colorbar={'title': 'Score'},
+        hovertemplate='Renda: R$ %{x:,.0f}<br>Empréstimo: R$ %{y:,.0f}<br>Score: %{z:.3f}<extra></extra>'
+    ))
+    
+    # Fronteira de aprovação (score = threshold)
+    fig.add_trace(go.Contour(
+        x=rendas,
+        y=valores,
+        z=scores,
+        contours={'start': threshold, 'end': threshold, 'size': 1, 'coloring': 'lines'},
+        line={'color': 'white', 'width': 3},
+        showscale=False,
+        hoverinfo='skip',
+        name=f'Fronteira de aprovação ({threshold})'
+    ))
+    
+    if renda_atual is not None and valor_atual is not None:
+        fig.add_trace(go.Scatter(
+            x=[renda_atual],
+            y=[valor_atual],
+            mode='markers',
+            marker={'size': 14, 'color': COLORS['primary'], 'symbol': 'x', 'line': {'width': 2, 'color': 'white'}},
+            name='Perfil analisado'
+        ))
+    
+    fig.update_layout(
+        title={
+            'text': 'Superfície What-If: Score por Renda e Valor do Empréstimo',
+            'x': 0.5,
+            'font': {'size': 18, 'color': COLORS['primary']}
+        },
+        xaxis_title='Renda Mensal (R$)',
+        yaxis_title='Valor do Empréstimo (R$)',
+        template='plotly_white',
+        height=550,
+        showlegend=True,
+        legend={'orientation': 'h', 'y': -0.15}
+    )
+    
+    return fig
+
+def create_roi_sensitivity(reducoes, taxas_inadimplencia, roi, reducao_atual=None, taxa_atual=None):
+    """
+    Mapa de calor do ROI em uma grade redução esperada x taxa de inadimplência
+    
+    Args:
+        reducoes: Eixo x (redução da inadimplência em %)
+        taxas_inadimplencia: Eixo y (taxa de inadimplência atual em %)
+        roi: Matriz len(taxas_inadimplencia) x len(reducoes) com o ROI em %
+        reducao_atual: Redução do cenário calculado (marcador opcional)
+        taxa_atual: Taxa de inadimplência do cenário calculado (marcador opcional)
+    """
+    
+    fig = go.Figure(go.Heatmap(
+        x=reducoes,
+        y=taxas_inadimplencia,
+        z=roi,
+        zmid=0,
+        colorscale=[[0, '#DC2626'], [0.5, COLORS['light_gray']], [1, COLORS['success']]],
+        colorbar={'title': 'ROI (%)'},
+        hovertemplate='Redução: %{x:.1f}%<br>Inadimplência: %{y:.1f}%<br>ROI: %{z:,.1f}%<extra></extra>'
+    ))
+    
+    # Ponto de equilíbrio (ROI = 0)
+    fig.add_trace(go.Contour(
+        x=reducoes,
+        y=taxas_inadimplencia,
+        z=roi,
+        contours={'start': 0, 'end': 0, 'size': 1, 'coloring': 'lines'},
+        line={'color': COLORS['primary'], 'width': 2, 'dash': 'dash'},
+        showscale=False,
+        hoverinfo='skip',
+        name='Ponto de equilíbrio (ROI = 0)'
+    ))
+    
+    if reducao_atual is not None and taxa_atual is not None:
+        fig.add_trace(go.Scatter(
+            x=[reducao_atual],
+            y=[taxa_atual],
+            mode='markers',
+            marker={'size': 14, 'color': COLORS['primary'], 'symbol': 'x', 'line': {'width': 2, 'color': 'white'}},
+            name='Cenário calculado'
+        ))
+    
+    fig.update_layout(
+        title={
+            'text': 'Sensibilidade do ROI',
+            'x': 0.5,
+            'font': {'size': 16, 'color': COLORS['primary']}
+        },
+        xaxis_title='Redução da Inadimplência (%)',
+        yaxis_title='Inadimplência Atual (%)',
+        template='plotly_white',
+        height=450,
+        showlegend=True,
+        legend={'orientation': 'h', 'y': -0.2}
+    )
+    
+    return fig
+
+def create_cashflow_chart(economia_por_mes, investimento):
+    """
+    Economia mensal do modelo (barras) e economia acumulada frente ao investimento
+    
+    Args:
+        economia_por_mes: Economia de cada mês do horizonte em R$
+        investimento: Investimento inicial em R$
+    """
+    
+    meses = np.arange(1, len(economia_por_mes) + 1)
+    
+    fig = make_subplots(specs=[[{"secondary_y": True}]])
+    
+    fig.add_trace(go.Bar(
+        x=meses,
+        y=economia_por_mes,
+        name='Economia no mês',
+        marker_color=COLORS['light_blue'],
+        hovertemplate='Mês %{x}<br>R$ %{y:,.0f}<extra></extra>'
+    ), secondary_y=False)
+    
+    fig.add_trace(go.Scatter(
+        x=meses,
+        y=np.cumsum(economia_por_mes),
+        mode='lines',
+        name='Economia acumulada',
+        line=dict(color=COLORS['success'], width=3),
+        hovertemplate='Mês %{x}<br>Acumulado: R$ %{y:,.0f}<extra></extra>'
+    ), secondary_y=True)
+    
+    fig.add_trace(go.Scatter(
+        x=[meses[0], meses[-1]],
+        y=[investimento, investimento],
+        mode='lines',
+        name='Investimento',
+        line=dict(color='#EF4444', dash='dash', width=2),
+        hoverinfo='skip'
+    ), secondary_y=True)
+    
+    fig.update_layout(
+        title={
+            'text': 'Fluxo de Caixa da Economia por Mês',
+            'x': 0.5,
+            'font': {'size': 18, 'color': COLORS['primary']}
+        },
+        xaxis_title='Mês',
+        template='plotly_white',
+        height=450,
+        legend=dict(orientation="h", yanchor="bottom", y=-0.3, xanchor="center", x=0.5)
+    )
+    fig.update_yaxes(title_text='Economia no Mês (R$)', secondary_y=False)
+    fig.update_yaxes(title_text='Acumulado (R$)', secondary_y=True)
+    
+    return fig
+
 def create_risk_gauge(risk_score):
     """Cria medidor de risco para o simulador"""
     
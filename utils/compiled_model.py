@@ -0,0 +1,168 @@
+import os
+
+import numpy as np
+
+from utils.scoring import MODEL_PATH, load_model
+
+# Mesmas convenções de valores ausentes do LightGBM (missing_type no dump do modelo)
+MISSING_TYPES = {'None': 0, 'Zero': 1, 'NaN': 2}
+K_ZERO_THRESHOLD = 1e-35
+
+# Linhas avaliadas por vez, limitando a matriz (linhas x árvores) de nós em memória
+ROW_CHUNK = 2048
+
+_compiled_cache = {}
+
+class CompiledModel:
+    """
+    Ensemble LightGBM achatado em arrays NumPy
+
+    Todos os nós de todas as árvores ficam em arrays únicos (feature, threshold,
+    left, right, leaf value). Folhas apontam para si mesmas, então cada nível é
+    avaliado para todas as árvores de uma vez e `max_depth` passos bastam.
+    Expõe `feature_name_` e `predict_proba` como o LGBMClassifier.
+    """
+
+    def __init__(self, feature, threshold, left, right, default_left, missing_type,
+                 value, roots, max_depth, feature_names, sigmoid=1.0):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.default_left = default_left
+        self.missing_type = missing_type
+        self.value = value
+        self.roots = roots
+        self.max_depth = max_depth
+        self.feature_name_ = feature_names
+        self.sigmoid = sigmoid
+
+    @classmethod
+    def from_model(cls, model):
+        """
+        Compila um LGBMClassifier (ou Booster) binário
+
+        Args:
+            model: Modelo treinado com objective binary
+
+        Returns:
+            CompiledModel: Representação achatada do ensemble
+        """
+
+        booster = getattr(model, 'booster_', model)
+        dump = booster.dump_model()
+
+        objective = dump['objective'].split()
+        if objective[0] != 'binary':
+            raise ValueError(f"Objective não suportado: {dump['objective']}")
+        sigmoid = float(objective[1].split(':')[1]) if len(objective) > 1 else 1.0
+
+        nodes = {key: [] for key in
+                 ['feature', 'threshold', 'left', 'right', 'default_left', 'missing_type', 'value']}
+        roots = []
+        max_depth = 0
+
+        def add_node(tree_node, depth):
+            nonlocal max_depth
+            node_id = len(nodes['feature'])
+            for key in nodes:
+                nodes[key].append(0)
+
+            if 'leaf_value' in tree_node:
+                # Folha aponta para si mesma: passos extras não mudam o resultado
+                nodes['left'][node_id] = node_id
+                nodes['right'][node_id] = node_id
+                nodes['threshold'][node_id] = np.inf
+                nodes['value'][node_id] = tree_node['leaf_value']
+                max_depth = max(max_depth, depth)
+                return node_id
+
+            if tree_node['decision_type'] != '<=':
+                raise ValueError("Splits categóricos não são suportados")
+
+            nodes['feature'][node_id] = tree_node['split_feature']
+            nodes['threshold'][node_id] = tree_node['threshold']
+            nodes['default_left'][node_id] = tree_node['default_left']
+            nodes['missing_type'][node_id] = MISSING_TYPES[tree_node['missing_type']]
+            nodes['left'][node_id] = add_node(tree_node['left_child'], depth + 1)
+            nodes['right'][node_id] = add_node(tree_node['right_child'], depth + 1)
+            return node_id
+
+        for tree in dump['tree_info']:
+            roots.append(add_node(tree['tree_structure'], 0))
+
+        return cls(
+            feature=np.array(nodes['feature'], dtype=np.int32),
+            threshold=np.array(nodes['threshold'], dtype=np.float64),
+            left=np.array(nodes['left'], dtype=np.int32),
+            right=np.array(nodes['right'], dtype=np.int32),
+            default_left=np.array(nodes['default_left'], dtype=bool),
+            missing_type=np.array(nodes['missing_type'], dtype=np.int8),
+            value=np.array(nodes['value'], dtype=np.float64),
+            roots=np.array(roots, dtype=np.int32),
+            max_depth=max_depth,
+            feature_names=list(dump['feature_names']),
+            sigmoid=sigmoid
+        )
+
+    def _as_matrix(self, X):
+        if hasattr(X, 'columns'):
+            X = X[self.feature_name_]
+        X = np.asarray(X, dtype=np.float64)
+        return X.reshape(1, -1) if X.ndim == 1 else X
+
+    def _raw_chunk(self, X):
+        rows = np.arange(X.shape[0])[:, None]
+        node = np.broadcast_to(self.roots, (X.shape[0], self.roots.size))
+
+        for _ in range(self.max_depth):
+            fval = X[rows, self.feature[node]]
+            missing_type = self.missing_type[node]
+            is_nan = np.isnan(fval)
+
+            # LightGBM trata NaN como 0 quando o split não tem missing_type NaN
+            fval = np.where(is_nan & (missing_type != MISSING_TYPES['NaN']), 0.0, fval)
+            is_missing = (
+                ((missing_type == MISSING_TYPES['Zero']) & (np.abs(fval) <= K_ZERO_THRESHOLD)) |
+                ((missing_type == MISSING_TYPES['NaN']) & is_nan)
+            )
+            go_left = np.where(is_missing, self.default_left[node], fval <= self.threshold[node])
+            node = np.where(go_left, self.left[node], self.right[node])
+
+        return self.value[node].sum(axis=1)
+
+    def predict_raw(self, X):
+        """Soma das folhas de todas as árvores (log-odds)"""
+
+        X = self._as_matrix(X)
+        if X.shape[0] <= ROW_CHUNK:
+            return self._raw_chunk(X)
+
+        return np.concatenate([
+            self._raw_chunk(X[start:start + ROW_CHUNK])
+            for start in range(0, X.shape[0], ROW_CHUNK)
+        ])
+
+    def predict_proba(self, X):
+        """Probabilidades no formato do scikit-learn: colunas [classe 0, classe 1]"""
+
+        proba = 1.0 / (1.0 + np.exp(-self.sigmoid * self.predict_raw(X)))
+        return np.column_stack([1.0 - proba, proba])
+
+def load_compiled_model(model_path=MODEL_PATH, reload=False):
+    """
+    Carrega e compila o modelo uma única vez por caminho
+
+    Args:
+        model_path: Caminho do arquivo .pkl gerado pelo notebook
+        reload: Relê e recompila o modelo mesmo que o caminho já esteja carregado
+
+    Returns:
+        CompiledModel: Scorer compatível com score_frame e score_parquet
+    """
+
+    path = os.path.abspath(model_path)
+    if reload or path not in _compiled_cache:
+        _compiled_cache[path] = CompiledModel.from_model(load_model(path, reload))
+
+    return _compiled_cache[path]
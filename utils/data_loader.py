@@ -1,7 +1,24 @@
 
+import os
+
 import pandas as pd
 import numpy as np
 
+from utils.feature_importance import load_model_feature_importance
+from utils.scoring import MODEL_PATH
+
+# Faixas de risco da carteira, em ordem crescente de risco
+RISK_CATEGORIES = ['Baixo Risco', 'Médio Risco', 'Alto Risco']
+
+# Meses de originação da carteira sintética (AAAA-MM, 24 meses)
+ORIGINATION_MONTHS = list(pd.period_range(end='2025-06', periods=24, freq='M').strftime('%Y-%m'))
+
+# Colunas obrigatórias de um arquivo de cenários de ROI (opcionais: cenario, investimento_inicial)
+ROI_SCENARIO_COLUMNS = ['volume_mensal', 'taxa_juros', 'taxa_inadimplencia_atual', 'reducao_inadimplencia']
+
+# Scores do modelo no conjunto de teste, exportados pelo notebook (target, score)
+TEST_SCORES_PATH = "notebook/test_scores.parquet"
+
 def load_model_data():
     """Carrega dados dos modelos baseados no relatório"""
     
@@ -30,50 +47,10 @@ def load_business_metrics():
     
     return kpis
 
-def load_feature_importance():
-    """Carrega importância das variáveis baseada no relatório"""
-    
-    features = {
-        'Variable': [
-            'riskassesment_940T',
-            'avgpmtlast12m_4525200A', 
-            'avgdbddpdlast24m_3658932P',
-            'maininc_215A',
-            'maxdpdlast24m_143P',
-            'annuity_780A',
-            'numactivecreds_622L',
-            'currdebt_22A',
-            'applications30d_658L',
-            'education_1103M'
-        ],
-        'Importance': [0.85, 0.78, 0.72, 0.68, 0.65, 0.61, 0.58, 0.55, 0.51, 0.48],
-        'Category': [
-            'Score Externo',
-            'Histórico Pagamento',
-            'Histórico Pagamento', 
-            'Capacidade Pagamento',
-            'Histórico Pagamento',
-            'Capacidade Pagamento',
-            'Utilização Crédito',
-            'Utilização Crédito',
-            'Consultas Recentes',
-            'Dados Demográficos'
-        ],
-        'Description': [
-            'Score de risco externo',
-            'Pagamento médio últimos 12 meses',
-            'Média dias atraso últimos 24 meses',
-            'Renda principal mensal',
-            'Máximo dias atraso 24 meses',
-            'Valor anuidade mensal',
-            'Número créditos ativos',
-            'Dívida atual total',
-            'Aplicações últimos 30 dias',
-            'Nível de escolaridade'
-        ]
-    }
+def load_feature_importance(model_path=MODEL_PATH):
+    """Carrega a importância das variáveis extraída do modelo (cache em disco por hash do arquivo)"""
     
-    return pd.DataFrame(features)
+    return load_model_feature_importance(model_path)
 
 def load_confusion_matrix_data():
     """Carrega dados da matriz de confusão"""
@@ -102,35 +79,107 @@ def load_confusion_matrix_data():
     
     return confusion_matrix
 
-def generate_sample_portfolio():
-    """Gera amostra da carteira para análises"""
+def load_test_scores(path=TEST_SCORES_PATH):
+    """
+    Carrega labels e scores reais do conjunto de teste
+    
+    Args:
+        path: Parquet com as colunas target e score
+    
+    Returns:
+        DataFrame ou None: None quando o notebook ainda não exportou os scores
+    """
+    
+    if not os.path.exists(path):
+        return None
+    
+    return pd.read_parquet(path, columns=['target', 'score'])
+
+def generate_sample_portfolio(n_samples=1000, seed=42):
+    """
+    Gera amostra sintética da carteira para análises e testes de carga
+    
+    Usa um np.random.Generator próprio (mesma semente -> mesma carteira) e tipos
+    compactos: float32 nos valores, int8 na idade e categorias (faixa de risco
+    ordenada e mês de originação). A 10 milhões de linhas a carteira ocupa cerca
+    de 150 MB (15 bytes por cliente).
+    
+    Args:
+        n_samples: Número de clientes
+        seed: Semente do gerador
     
-    np.random.seed(42)
-    n_samples = 1000
+    Returns:
+        DataFrame: risk_score, risk_category, loan_amount, monthly_income, age e
+        origination_month
+    """
+    
+    rng = np.random.default_rng(seed)
     
     # Simulando distribuição de risco baseada no modelo
-    risk_scores = np.random.beta(2, 8, n_samples)  # Distribuição beta para scores de risco
-    
-    # Categorizando risco
-    risk_categories = []
-    for score in risk_scores:
-        if score < 0.1:
-            risk_categories.append('Baixo Risco')
-        elif score < 0.3:
-            risk_categories.append('Médio Risco')
-        else:
-            risk_categories.append('Alto Risco')
+    risk_scores = rng.beta(2, 8, n_samples).astype(np.float32)  # Distribuição beta para scores de risco
+    
+    # Categorizando risco em um único passo: < 0.1 baixo, < 0.3 médio, demais alto
+    risk_codes = np.searchsorted(np.array([0.1, 0.3], dtype=np.float32), risk_scores, side='right')
     
     portfolio = pd.DataFrame({
         'risk_score': risk_scores,
-        'risk_category': risk_categories,
-        'loan_amount': np.random.normal(50000, 20000, n_samples),
-        'monthly_income': np.random.normal(8000, 3000, n_samples),
-        'age': np.random.randint(18, 70, n_samples)
+        'risk_category': pd.Categorical.from_codes(
+            risk_codes.astype(np.int8), RISK_CATEGORIES, ordered=True
+        ),
+        'loan_amount': 50000 + 20000 * rng.standard_normal(n_samples, dtype=np.float32),
+        'monthly_income': 8000 + 3000 * rng.standard_normal(n_samples, dtype=np.float32),
+        'age': rng.integers(18, 70, n_samples, dtype=np.int8),
+        'origination_month': pd.Categorical.from_codes(
+            rng.integers(0, len(ORIGINATION_MONTHS), n_samples, dtype=np.int8), ORIGINATION_MONTHS, ordered=True
+        )
     })
     
     return portfolio
 
+def roi_scenarios_frame(scenarios):
+    """
+    Cenários de ROI como DataFrame, um cenário por linha
+
+    Args:
+        scenarios: Dicionário nome -> parâmetros (formato de load_roi_scenarios)
+
+    Returns:
+        DataFrame: Coluna cenario e as colunas de ROI_SCENARIO_COLUMNS
+    """
+
+    frame = pd.DataFrame.from_dict(scenarios, orient='index')
+    return frame.rename_axis('cenario').reset_index()
+
+def read_roi_scenarios(file, file_name=None):
+    """
+    Lê um arquivo de cenários de ROI (CSV ou Parquet)
+
+    Args:
+        file: Caminho ou arquivo binário
+        file_name: Nome do arquivo, usado para identificar o formato (padrão: o caminho)
+
+    Returns:
+        DataFrame: Um cenário por linha, com a coluna cenario preenchida
+
+    Raises:
+        ValueError: Quando faltam colunas obrigatórias
+    """
+
+    file_name = file_name or str(file)
+    if file_name.lower().endswith('.parquet'):
+        scenarios = pd.read_parquet(file)
+    else:
+        scenarios = pd.read_csv(file)
+
+    missing = [col for col in ROI_SCENARIO_COLUMNS if col not in scenarios.columns]
+    if missing:
+        raise ValueError(f"Colunas ausentes no arquivo de cenários: {', '.join(missing)}")
+
+    if 'cenario' not in scenarios.columns:
+        scenarios.insert(0, 'cenario', [f"Cenário {i + 1}" for i in range(len(scenarios))])
+    scenarios['cenario'] = scenarios['cenario'].astype(str)
+    return scenarios.reset_index(drop=True)
+
 def load_roi_scenarios():
     """Carrega cenários para análise de ROI"""
     
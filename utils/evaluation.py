@@ -0,0 +1,315 @@
+import numpy as np
+import pandas as pd
+
+from utils.calculations import calculate_model_metrics
+from utils.cashflow import LGD_PADRAO, PRAZO_PADRAO, price_schedule
+
+# Reamostragens
+N_RESAMPLES = 2000
+
+# Elementos (reamostragens x linhas) processados por bloco no bootstrap
+BOOTSTRAP_CHUNK_ELEMENTS = 5_000_000
+
+class ThresholdSweep:
+    """
+    Matriz de confusão exata para todos os thresholds a partir de uma única ordenação
+
+    Os scores são ordenados uma vez (O(n log n)) e os positivos acumulados; a partir
+    daí TP/FP/TN/FN de qualquer threshold saem de uma busca binária (O(log n)).
+    Segue a regra do notebook: score >= threshold -> previsto inadimplente (classe 1).
+    """
+
+    def __init__(self, y_true, scores):
+        y_true = np.asarray(y_true).astype(bool)
+        scores = np.asarray(scores, dtype=np.float64)
+
+        # Ordena por score e, nos empates, negativos antes de positivos
+        order = np.lexsort((y_true, scores))
+        self.scores_sorted = scores[order]
+        self.labels_sorted = y_true[order]
+
+        # _cum_pos[i] = positivos entre os i menores scores
+        self._cum_pos = np.concatenate([[0], np.cumsum(self.labels_sorted, dtype=np.int64)])
+        self.n = scores.size
+        self.n_pos = int(self._cum_pos[-1])
+        self.n_neg = self.n - self.n_pos
+
+        # Contagens em cada threshold distinto (ordem crescente)
+        self.thresholds, self.group_starts = np.unique(self.scores_sorted, return_index=True)
+        self.tp, self.fp, self.tn, self.fn = self._counts_at(self.group_starts)
+
+    def _counts_at(self, index):
+        tp = self.n_pos - self._cum_pos[index]
+        fp = (self.n - index) - tp
+        return tp, fp, self.n_neg - fp, self.n_pos - tp
+
+    def counts(self, threshold):
+        """
+        TP, FP, TN e FN em um threshold (escalar ou array) via busca binária
+
+        Args:
+            threshold: Threshold de decisão
+
+        Returns:
+            dict: tp, fp, tn, fn
+        """
+
+        index = np.searchsorted(self.scores_sorted, threshold, side='left')
+        tp, fp, tn, fn = self._counts_at(index)
+        return {'tp': tp, 'fp': fp, 'tn': tn, 'fn': fn}
+
+    def confusion_matrix(self, threshold):
+        """Matriz no mesmo layout de load_confusion_matrix_data: [[tn, fp], [fn, tp]]"""
+
+        c = self.counts(threshold)
+        return np.array([
+            [c['tn'], c['fp']],
+            [c['fn'], c['tp']]
+        ])
+
+    def metrics(self, threshold):
+        """Saída de calculate_model_metrics no threshold informado"""
+
+        c = self.counts(threshold)
+        return calculate_model_metrics(c['tp'], c['tn'], c['fp'], c['fn'])
+
+    def table(self):
+        """DataFrame com as contagens em todos os thresholds distintos"""
+
+        return pd.DataFrame({
+            'threshold': self.thresholds,
+            'tp': self.tp,
+            'fp': self.fp,
+            'tn': self.tn,
+            'fn': self.fn
+        })
+
+    def roc_curve(self):
+        """
+        Curva ROC exata (um ponto por threshold distinto)
+
+        Returns:
+            tuple: (fpr, tpr) começando em (0, 0) e terminando em (1, 1)
+        """
+
+        # Thresholds decrescentes -> taxas crescentes
+        fpr = np.concatenate([[0.0], self.fp[::-1] / self.n_neg])
+        tpr = np.concatenate([[0.0], self.tp[::-1] / self.n_pos])
+        return fpr, tpr
+
+    def auc(self):
+        """AUC-ROC exata (trapézios sobre todos os thresholds distintos, empates incluídos)"""
+
+        fpr, tpr = self.roc_curve()
+        return float(np.sum(np.diff(fpr) * (tpr[1:] + tpr[:-1]) / 2))
+
+    def pr_curve(self):
+        """
+        Curva precision-recall exata
+
+        Returns:
+            tuple: (recall, precision) com recall crescente, começando em (0, 1)
+        """
+
+        tp = self.tp[::-1]
+        fp = self.fp[::-1]
+        recall = np.concatenate([[0.0], tp / self.n_pos])
+        precision = np.concatenate([[1.0], tp / (tp + fp)])
+        return recall, precision
+
+    def average_precision(self):
+        """Average precision: soma de precision ponderada pelos incrementos de recall"""
+
+        recall, precision = self.pr_curve()
+        return float(np.sum(np.diff(recall) * precision[1:]))
+
+def lttb_downsample(x, y, n_out):
+    """
+    Reduz uma curva para n_out pontos com Largest-Triangle-Three-Buckets
+
+    Mantém o primeiro e o último ponto e, em cada bucket intermediário, o ponto
+    que forma o maior triângulo com o ponto escolhido antes e a média do bucket
+    seguinte, preservando a forma visual da curva.
+
+    Args:
+        x: Coordenadas x (ordenadas)
+        y: Coordenadas y
+        n_out: Número de pontos desejado
+
+    Returns:
+        tuple: (x, y) reduzidos
+    """
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = x.size
+    if n_out >= n or n_out < 3:
+        return x, y
+
+    # Limites dos n_out - 2 buckets internos (primeiro e último pontos ficam fixos)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    for i in range(n_out - 2):
+        start, stop = edges[i], edges[i + 1]
+        next_start, next_stop = edges[i + 1], edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_start:next_stop].mean()
+        avg_y = y[next_start:next_stop].mean()
+
+        prev_x, prev_y = x[selected[i]], y[selected[i]]
+        area = np.abs(
+            (prev_x - avg_x) * (y[start:stop] - prev_y) -
+            (prev_x - x[start:stop]) * (avg_y - prev_y)
+        )
+        selected[i + 1] = start + np.argmax(area)
+
+    return x[selected], y[selected]
+
+def bootstrap_metrics(sweep, threshold, n_resamples=N_RESAMPLES, confidence=0.95, seed=42,
+                      chunk_elements=BOOTSTRAP_CHUNK_ELEMENTS):
+    """
+    Intervalos de confiança bootstrap para AUC e métricas de calculate_model_metrics
+
+    Cada reamostragem é representada pelas contagens de cada linha na ordem já
+    ordenada do ThresholdSweep, então nada é reordenado: o AUC sai da formulação
+    de Mann-Whitney sobre os grupos de empate pré-computados (negativos abaixo de
+    cada positivo, empates com peso 1/2) e as contagens no threshold de somas por
+    coluna. Milhares de reamostragens são processadas em blocos matriciais.
+
+    Args:
+        sweep: ThresholdSweep com labels e scores do teste
+        threshold: Threshold das métricas de classificação
+        n_resamples: Número de reamostragens
+        confidence: Nível de confiança do intervalo
+        seed: Semente do gerador
+        chunk_elements: Limite de elementos por bloco (controla a memória)
+
+    Returns:
+        DataFrame: metrica, estimativa, ic_inferior e ic_superior
+    """
+
+    rng = np.random.default_rng(seed)
+    n = sweep.n
+    labels = sweep.labels_sorted
+    n_groups = sweep.group_starts.size
+    cut_group = np.searchsorted(sweep.thresholds, threshold, side='left')
+    block = max(1, chunk_elements // n)
+
+    # Dentro de cada grupo de empate os negativos vêm antes dos positivos, então
+    # cada grupo tem no máximo dois trechos contíguos (score, label)
+    changes = (np.diff(sweep.scores_sorted) != 0) | (np.diff(labels) != 0)
+    run_starts = np.concatenate([[0], np.flatnonzero(changes) + 1])
+    run_is_pos = labels[run_starts]
+    run_group = np.searchsorted(sweep.group_starts, run_starts, side='right') - 1
+
+    results = {name: [] for name in
+               ['auc', 'accuracy', 'precision', 'recall', 'specificity', 'f1_score']}
+
+    for start in range(0, n_resamples, block):
+        b = min(block, n_resamples - start)
+
+        # Contagem de cada linha em cada reamostragem (b x n), via um único bincount
+        draws = rng.integers(0, n, size=(b, n)) + (np.arange(b) * n)[:, None]
+        weights = np.bincount(draws.ravel(), minlength=b * n).reshape(b, n)
+        run_weights = np.add.reduceat(weights, run_starts, axis=1)
+
+        pos_groups = np.zeros((b, n_groups), dtype=np.int64)
+        neg_groups = np.zeros((b, n_groups), dtype=np.int64)
+        pos_groups[:, run_group[run_is_pos]] = run_weights[:, run_is_pos]
+        neg_groups[:, run_group[~run_is_pos]] = run_weights[:, ~run_is_pos]
+
+        # Mann-Whitney por grupo de empate
+        neg_below = np.cumsum(neg_groups, axis=1) - neg_groups
+        n_pos = pos_groups.sum(axis=1)
+        n_neg = neg_groups.sum(axis=1)
+        results['auc'].append(
+            (pos_groups * (neg_below + 0.5 * neg_groups)).sum(axis=1) / (n_pos * n_neg)
+        )
+
+        # Matriz de confusão de cada reamostragem no threshold
+        tp = pos_groups[:, cut_group:].sum(axis=1)
+        fp = neg_groups[:, cut_group:].sum(axis=1)
+        metrics = calculate_model_metrics(tp, n_neg - fp, fp, n_pos - tp)
+        for name in results:
+            if name != 'auc':
+                results[name].append(metrics[name])
+
+    point = sweep.metrics(threshold)
+    point['auc'] = sweep.auc()
+    alpha = (1 - confidence) / 2
+
+    rows = []
+    for name, values in results.items():
+        values = np.concatenate(values)
+        rows.append({
+            'metrica': name,
+            'estimativa': float(point[name]),
+            'ic_inferior': float(np.nanquantile(values, alpha)),
+            'ic_superior': float(np.nanquantile(values, 1 - alpha))
+        })
+
+    return pd.DataFrame(rows)
+
+def optimize_threshold(sweep, valor_emprestimo, taxa_juros, prazo=PRAZO_PADRAO, lgd=LGD_PADRAO):
+    """
+    Threshold que maximiza o lucro esperado da concessão, avaliado em todos os thresholds
+
+    Clientes com score abaixo do threshold são aprovados. Cada adimplente
+    aprovado (TN) rende a margem de juros da Tabela Price no prazo; cada
+    inadimplente aprovado (FN) perde lgd do valor emprestado; recusados não
+    geram resultado:
+
+        lucro(t) = valor * (margem * TN(t) - lgd * FN(t))
+
+    As contagens de todos os thresholds já saem da ordenação única do sweep, então
+    a curva inteira custa O(thresholds distintos).
+
+    Args:
+        sweep: ThresholdSweep com os scores e rótulos reais
+        valor_emprestimo: Valor médio do empréstimo em R$
+        taxa_juros: Taxa de juros mensal em %
+        prazo: Número de parcelas
+        lgd: Perda dada a inadimplência (0 a 1)
+
+    Returns:
+        dict: threshold ótimo, lucro por solicitante no ótimo, margem, curva
+        (DataFrame threshold, lucro, taxa_aprovacao, inadimplencia_aprovados) e
+        roi_inputs (taxa_juros, taxa_inadimplencia_atual e reducao_inadimplencia
+        para calculate_roi, comparando aprovar todos com o threshold ótimo)
+    """
+
+    _, parcela = price_schedule(taxa_juros, prazo)
+    margem = float(parcela[0] * prazo - 1)
+
+    # Candidatos: cada score distinto e um threshold acima de todos (aprovar todos)
+    aprova_todos = max(1.0, np.nextafter(sweep.thresholds[-1], np.inf))
+    thresholds = np.append(sweep.thresholds, aprova_todos)
+    tn = np.append(sweep.tn, sweep.n_neg)
+    fn = np.append(sweep.fn, sweep.n_pos)
+
+    lucro = valor_emprestimo * (margem * tn - lgd * fn) / sweep.n
+    aprovados = tn + fn
+    inadimplencia_aprovados = np.divide(fn, aprovados, out=np.zeros(aprovados.shape), where=aprovados > 0)
+
+    best = int(np.argmax(lucro))
+    taxa_base = sweep.n_pos / sweep.n
+    taxa_otima = inadimplencia_aprovados[best]
+
+    return {
+        'threshold': float(thresholds[best]),
+        'lucro': float(lucro[best]),
+        'margem': margem,
+        'curva': pd.DataFrame({
+            'threshold': thresholds,
+            'lucro': lucro,
+            'taxa_aprovacao': aprovados / sweep.n,
+            'inadimplencia_aprovados': inadimplencia_aprovados
+        }),
+        'roi_inputs': {
+            'taxa_juros': taxa_juros,
+            'taxa_inadimplencia_atual': taxa_base * 100,
+            'reducao_inadimplencia': float((1 - taxa_otima / taxa_base) * 100) if taxa_base > 0 else 0.0
+        }
+    }
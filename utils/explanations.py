@@ -0,0 +1,170 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+from utils.cache import MAX_ENTRIES, TTL_SECONDS, ScoreCache
+from utils.scoring import MODEL_PATH, load_model
+
+# Dicionário de variáveis do dataset (Variable, Description)
+FEATURE_DEFINITIONS_PATH = "notebook/feature_definitions.csv"
+
+# Motivos retornados por solicitante
+TOP_K = 3
+
+# Nome original da variável (ex.: lastapprdate_640D) seguido do sufixo criado no notebook
+_BASE_FEATURE = re.compile(r'^(.+?_\d+[A-Z])(?:_(.+))?$')
+
+def load_feature_descriptions(path=FEATURE_DEFINITIONS_PATH):
+    """
+    Carrega a descrição de cada variável do dataset
+
+    Args:
+        path: CSV com as colunas Variable e Description
+
+    Returns:
+        dict: Variável -> descrição
+    """
+
+    definitions = pd.read_csv(path)
+    return dict(zip(definitions['Variable'], definitions['Description'].str.rstrip('.')))
+
+def base_feature(name):
+    """Variável original de uma feature processada (partes de data e one-hot voltam à coluna de origem)"""
+
+    match = _BASE_FEATURE.match(name)
+    return match.group(1) if match else name
+
+class ReasonExplainer:
+    """
+    Motivos de recusa por solicitante a partir das contribuições TreeSHAP do modelo
+
+    As contribuições vêm do TreeSHAP nativo do LightGBM (pred_contrib=True), em
+    uma chamada por lote. Features derivadas da mesma variável (partes da data,
+    colunas one-hot) são somadas antes do ranking, de modo que cada motivo é uma
+    variável do dicionário. Vetores idênticos são explicados uma única vez: as
+    linhas do lote são deduplicadas e as explicações ficam em um ScoreCache;
+    quando o arquivo do modelo muda, o modelo é recarregado e o cache descartado.
+    """
+
+    def __init__(self, model, descriptions=None, top_k=TOP_K, cache_entries=MAX_ENTRIES,
+                 cache_ttl=TTL_SECONDS, model_path=None):
+        self.top_k = top_k
+        self.descriptions = descriptions if descriptions is not None else load_feature_descriptions()
+        self._set_model(model)
+
+        self.cache = None
+        if cache_entries > 0:
+            # Chaves são os bytes das linhas, calculados em lote em explain
+            self.cache = ScoreCache(cache_entries, cache_ttl, model_path=model_path,
+                                    on_model_change=self._reload_model)
+
+    def _set_model(self, model):
+        self.booster = model.booster_
+        self.feature_names = list(model.feature_name_)
+
+        # Matriz 0/1 (features x variáveis) que agrega as contribuições por variável original
+        bases = [base_feature(name) for name in self.feature_names]
+        self.variables = list(dict.fromkeys(bases))
+        self.group_matrix = np.zeros((len(self.feature_names), len(self.variables)))
+        self.group_matrix[np.arange(len(bases)), [self.variables.index(b) for b in bases]] = 1.0
+        self.reasons = np.array([self.descriptions.get(var, var) for var in self.variables], dtype=object)
+
+    def _reload_model(self, model_path):
+        self._set_model(load_model(model_path, reload=True))
+
+    @property
+    def n_reasons(self):
+        """Motivos por solicitante: top_k limitado ao número de variáveis"""
+
+        return min(self.top_k, len(self.variables))
+
+    def contributions(self, X):
+        """
+        Contribuições TreeSHAP agregadas por variável original (em log-odds)
+
+        Args:
+            X: Matriz (linhas x features) na ordem de feature_names
+
+        Returns:
+            np.ndarray: Matriz linhas x variáveis
+        """
+
+        contrib = self.booster.predict(X, pred_contrib=True)
+        # Última coluna é o valor esperado do modelo, igual para todas as linhas
+        return contrib[:, :-1] @ self.group_matrix
+
+    def _top_reasons(self, contrib):
+        k = self.n_reasons
+        top = np.argpartition(-contrib, k - 1, axis=1)[:, :k]
+        top_values = np.take_along_axis(contrib, top, axis=1)
+        order = np.argsort(-top_values, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        top_values = np.take_along_axis(top_values, order, axis=1)
+
+        # Apenas contribuições que aumentam o risco são motivos de recusa
+        reasons = np.where(top_values > 0, self.reasons[top], None)
+        top_values = np.where(top_values > 0, top_values, np.nan)
+        return reasons, top_values
+
+    def explain(self, df):
+        """
+        Top-k motivos de cada solicitante
+
+        Args:
+            df: DataFrame (ou matriz) com as features do modelo
+
+        Returns:
+            DataFrame: motivo_1..k e contribuicao_1..k por linha (None/NaN quando não há motivo)
+        """
+
+        # Troca do modelo é detectada antes de montar a matriz com as features do modelo atual
+        if self.cache is not None:
+            self.cache.check_model()
+
+        X = df[self.feature_names].to_numpy(dtype=np.float64) if isinstance(df, pd.DataFrame) \
+            else np.asarray(df, dtype=np.float64)
+        # Normaliza -0.0 e NaN para que valores equivalentes gerem os mesmos bytes
+        X = np.ascontiguousarray(np.where(np.isnan(X), np.nan, X + 0.0))
+        k = self.n_reasons
+
+        # Linhas idênticas são explicadas (e consultadas no cache) uma única vez
+        row_bytes = X.shape[1] * X.itemsize
+        _, first, inverse = np.unique(X.view(np.dtype((np.void, row_bytes))).ravel(),
+                                      return_index=True, return_inverse=True)
+        unique_reasons = np.empty((first.size, k), dtype=object)
+        unique_values = np.empty((first.size, k))
+
+        pending = np.arange(first.size)
+        if self.cache is not None and first.size > 0:
+            buffer = X[first].tobytes()
+            keys = [buffer[i:i + row_bytes] for i in range(0, len(buffer), row_bytes)]
+            cached = self.cache.get_many(keys)
+            hits = np.array([entry is not None for entry in cached], dtype=bool)
+            if hits.any():
+                hit_index = np.flatnonzero(hits)
+                unique_reasons[hit_index] = np.stack([cached[i][0] for i in hit_index])
+                unique_values[hit_index] = np.stack([cached[i][1] for i in hit_index])
+            pending = np.flatnonzero(~hits)
+
+        if pending.size > 0:
+            new_reasons, new_values = self._top_reasons(self.contributions(X[first[pending]]))
+            unique_reasons[pending] = new_reasons
+            unique_values[pending] = new_values
+            if self.cache is not None:
+                self.cache.put_many([keys[i] for i in pending], zip(new_reasons, new_values))
+
+        reasons = unique_reasons[inverse.ravel()]
+        values = unique_values[inverse.ravel()]
+
+        result = {}
+        for rank in range(k):
+            result[f'motivo_{rank + 1}'] = reasons[:, rank]
+            result[f'contribuicao_{rank + 1}'] = values[:, rank]
+        return pd.DataFrame(result)
+
+def load_explainer(model_path=MODEL_PATH, top_k=TOP_K, definitions_path=FEATURE_DEFINITIONS_PATH):
+    """Explainer do modelo serializado com as descrições do dicionário de variáveis"""
+
+    return ReasonExplainer(load_model(model_path), load_feature_descriptions(definitions_path),
+                           top_k, model_path=model_path)
@@ -0,0 +1,112 @@
+import hashlib
+import os
+
+import pandas as pd
+
+from utils.cache import file_signature
+from utils.explanations import FEATURE_DEFINITIONS_PATH, base_feature, load_feature_descriptions
+from utils.scoring import MODEL_PATH, load_model
+
+# Diretório do cache persistente (fora do versionamento)
+CACHE_DIR = ".cache"
+
+# Categoria pelo sufixo do nome da variável no dataset Home Credit
+CATEGORIES_BY_SUFFIX = {
+    'P': 'Histórico Pagamento',
+    'A': 'Capacidade Pagamento',
+    'L': 'Utilização Crédito',
+    'M': 'Dados Demográficos',
+    'D': 'Datas e Recência',
+    'T': 'Score Externo'
+}
+
+_hash_cache = {}
+
+def model_file_hash(model_path=MODEL_PATH):
+    """
+    SHA-256 do arquivo do modelo, recalculado só quando mtime ou tamanho mudam
+
+    Args:
+        model_path: Caminho do arquivo .pkl
+
+    Returns:
+        str: Hash hexadecimal
+    """
+
+    path = os.path.abspath(model_path)
+    signature = file_signature(path)
+    cached = _hash_cache.get(path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            digest.update(block)
+
+    _hash_cache[path] = (signature, digest.hexdigest())
+    return _hash_cache[path][1]
+
+def extract_feature_importance(model, descriptions=None):
+    """
+    Importâncias gain e split de todas as variáveis, direto do booster
+
+    Features derivadas (partes de data, colunas one-hot) são somadas na variável
+    original, a mesma granularidade dos motivos de recusa.
+
+    Args:
+        model: LGBMClassifier treinado
+        descriptions: Dicionário variável -> descrição (padrão: feature_definitions.csv)
+
+    Returns:
+        DataFrame: Variable, Gain, Split, Importance (gain / maior gain), Category e
+        Description, em ordem decrescente de importância
+    """
+
+    booster = model.booster_
+    descriptions = descriptions if descriptions is not None else load_feature_descriptions()
+
+    importance = pd.DataFrame({
+        'Variable': [base_feature(name) for name in booster.feature_name()],
+        'Gain': booster.feature_importance(importance_type='gain'),
+        'Split': booster.feature_importance(importance_type='split')
+    }).groupby('Variable', as_index=False, sort=False).sum()
+
+    importance['Importance'] = importance['Gain'] / importance['Gain'].max()
+    importance['Category'] = importance['Variable'].str[-1].map(CATEGORIES_BY_SUFFIX).fillna('Outros')
+    importance['Description'] = importance['Variable'].map(descriptions).fillna('')
+
+    return importance.sort_values('Importance', ascending=False, ignore_index=True)
+
+def load_model_feature_importance(model_path=MODEL_PATH, cache_dir=CACHE_DIR,
+                                  definitions_path=FEATURE_DEFINITIONS_PATH):
+    """
+    Importâncias do modelo com cache em disco por hash do arquivo
+
+    A primeira chamada para um modelo percorre as árvores e grava um Parquet em
+    cache_dir; as seguintes (inclusive em outros processos) só leem esse arquivo.
+    Um novo modelo gera um novo hash e, portanto, uma nova extração.
+
+    Args:
+        model_path: Caminho do modelo serializado
+        cache_dir: Diretório do cache
+        definitions_path: CSV com as descrições das variáveis
+
+    Returns:
+        DataFrame: Saída de extract_feature_importance
+    """
+
+    cache_path = os.path.join(cache_dir, f"feature_importance_{model_file_hash(model_path)[:16]}.parquet")
+    if os.path.exists(cache_path):
+        return pd.read_parquet(cache_path)
+
+    importance = extract_feature_importance(load_model(model_path),
+                                            load_feature_descriptions(definitions_path))
+
+    # Escrita atômica: leitores concorrentes nunca veem um arquivo parcial
+    os.makedirs(cache_dir, exist_ok=True)
+    temp_path = f"{cache_path}.{os.getpid()}.tmp"
+    importance.to_parquet(temp_path, index=False)
+    os.replace(temp_path, cache_path)
+
+    return importance
@@ -0,0 +1,115 @@
+import numpy as np
+
+from utils.calculations import calculate_roi
+
+# Simulações por execução
+N_SIMULATIONS = 1_000_000
+
+# Simulações avaliadas por bloco (limita os arrays intermediários)
+MC_CHUNK_ROWS = 250_000
+
+# Distribuições disponíveis e seus parâmetros
+DISTRIBUTIONS = {
+    'triangular': ('mínimo', 'moda', 'máximo'),
+    'normal': ('média', 'desvio padrão'),
+    'uniforme': ('mínimo', 'máximo'),
+    'fixo': ('valor',)
+}
+
+def spread_distribution(kind, value, spread):
+    """
+    Distribuição centrada em um valor pontual, com variação relativa
+
+    Args:
+        kind: Chave de DISTRIBUTIONS
+        value: Valor pontual (moda, média ou centro)
+        spread: Variação relativa (0.2 -> ±20%; na normal, desvio padrão de 20% do valor)
+
+    Returns:
+        tuple: (kind, parâmetros)
+    """
+
+    if kind == 'triangular':
+        return kind, (value * (1 - spread), value, value * (1 + spread))
+    if kind == 'normal':
+        return kind, (value, value * spread)
+    if kind == 'uniforme':
+        return kind, (value * (1 - spread), value * (1 + spread))
+    if kind == 'fixo':
+        return kind, (value,)
+    raise ValueError(f"Distribuição desconhecida: {kind}")
+
+def _draw(rng, distribution, size):
+    kind, params = distribution
+    if kind == 'triangular':
+        low, mode, high = params
+        if high <= low:
+            return np.full(size, mode, dtype=np.float64)
+        return rng.triangular(low, mode, high, size)
+    if kind == 'normal':
+        return rng.normal(params[0], params[1], size)
+    if kind == 'uniforme':
+        return rng.uniform(params[0], params[1], size)
+    if kind == 'fixo':
+        return np.full(size, params[0], dtype=np.float64)
+    raise ValueError(f"Distribuição desconhecida: {kind}")
+
+def simulate_roi(volume_mensal, taxa_inadimplencia_atual, reducao_inadimplencia, investimento_inicial,
+                 taxa_juros=0.0, meses=12, n_simulations=N_SIMULATIONS, chunk_rows=MC_CHUNK_ROWS, seed=42):
+    """
+    Simulação Monte Carlo do ROI
+
+    Cada simulação sorteia em conjunto volume, inadimplência, redução e
+    investimento a partir das distribuições informadas e aplica calculate_roi
+    (vetorizado) bloco a bloco. Valores sorteados negativos são truncados em zero
+    e investimentos em um real, para manter as premissas válidas.
+
+    Args:
+        volume_mensal: Distribuição (kind, parâmetros) do volume mensal em R$
+        taxa_inadimplencia_atual: Distribuição da inadimplência atual em %
+        reducao_inadimplencia: Distribuição da redução esperada em %
+        investimento_inicial: Distribuição do investimento em R$
+        taxa_juros: Taxa de juros mensal em % (fixa)
+        meses: Período de análise em meses (fixo)
+        n_simulations: Número de simulações
+        chunk_rows: Simulações por bloco
+        seed: Semente do gerador
+
+    Returns:
+        dict: roi e payback (arrays por simulação), percentis P5/P50/P95 de ROI e
+        payback, probabilidade de prejuízo e probabilidade de payback no período
+    """
+
+    rng = np.random.default_rng(seed)
+    roi = np.empty(n_simulations)
+    payback = np.empty(n_simulations)
+
+    for start in range(0, n_simulations, chunk_rows):
+        size = min(chunk_rows, n_simulations - start)
+        resultado = calculate_roi(
+            volume_mensal=np.maximum(_draw(rng, volume_mensal, size), 0.0),
+            taxa_juros=taxa_juros,
+            taxa_inadimplencia_atual=np.clip(_draw(rng, taxa_inadimplencia_atual, size), 0.0, 100.0),
+            reducao_inadimplencia=np.clip(_draw(rng, reducao_inadimplencia, size), 0.0, 100.0),
+            investimento_inicial=np.maximum(_draw(rng, investimento_inicial, size), 1.0),
+            meses=meses
+        )
+        roi[start:start + size] = resultado['roi_percentual']
+        payback[start:start + size] = resultado['payback_meses']
+
+    roi_p5, roi_p50, roi_p95 = np.percentile(roi, [5, 50, 95])
+    # Payback infinito (sem economia) entra nos percentis como infinito
+    payback_p5, payback_p50, payback_p95 = np.percentile(payback, [5, 50, 95], method='inverted_cdf')
+
+    return {
+        'roi': roi,
+        'payback': payback,
+        'roi_p5': roi_p5,
+        'roi_p50': roi_p50,
+        'roi_p95': roi_p95,
+        'payback_p5': payback_p5,
+        'payback_p50': payback_p50,
+        'payback_p95': payback_p95,
+        'prob_prejuizo': float(np.mean(roi < 0)),
+        'prob_payback_periodo': float(np.mean(payback <= meses))
+    }
@@ -0,0 +1,159 @@
+import argparse
+import os
+import time
+from multiprocessing import get_context, shared_memory
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from utils.scoring import MODEL_PATH, load_model
+
+# Linhas por tarefa enviada aos workers (apenas índices trafegam entre processos)
+CHUNK_ROWS = 50_000
+
+_worker = {}
+
+def _init_worker(model_path, compiled, x_name, x_shape, out_name):
+    """Carrega o modelo uma vez por processo e mapeia as matrizes compartilhadas"""
+
+    if compiled:
+        from utils.compiled_model import load_compiled_model
+        model = load_compiled_model(model_path)
+        _worker['predict'] = lambda X: model.predict_proba(X)[:, 1]
+    else:
+        # Uma thread por processo: o paralelismo vem do número de workers
+        booster = load_model(model_path).booster_
+        _worker['predict'] = lambda X: booster.predict(X, num_threads=1)
+
+    x_shm = shared_memory.SharedMemory(name=x_name)
+    out_shm = shared_memory.SharedMemory(name=out_name)
+    _worker['shm'] = (x_shm, out_shm)
+    _worker['X'] = np.ndarray(x_shape, dtype=np.float64, buffer=x_shm.buf)
+    _worker['out'] = np.ndarray((x_shape[0],), dtype=np.float64, buffer=out_shm.buf)
+
+def _score_slice(bounds):
+    start, stop = bounds
+    _worker['out'][start:stop] = _worker['predict'](_worker['X'][start:stop])
+    return stop - start
+
+def _ready(_):
+    return os.getpid()
+
+class SharedFeatureMatrix:
+    """
+    Matriz de features e vetor de saída em memória compartilhada
+
+    A matriz é copiada uma única vez para o segmento compartilhado; os workers
+    acessam fatias por índice, sem serializar dados entre processos.
+    """
+
+    def __init__(self, X):
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        self.shape = X.shape
+        self.x_shm = shared_memory.SharedMemory(create=True, size=max(X.nbytes, 1))
+        self.out_shm = shared_memory.SharedMemory(create=True, size=max(X.shape[0] * 8, 1))
+        np.ndarray(self.shape, dtype=np.float64, buffer=self.x_shm.buf)[:] = X
+        self.out = np.ndarray((self.shape[0],), dtype=np.float64, buffer=self.out_shm.buf)
+
+    def run(self, n_workers, model_path=MODEL_PATH, compiled=False, chunk_rows=CHUNK_ROWS):
+        """
+        Escora a matriz com um pool de processos
+
+        Returns:
+            float: Segundos gastos na escoragem (sem a inicialização do pool)
+        """
+
+        bounds = [(start, min(start + chunk_rows, self.shape[0]))
+                  for start in range(0, self.shape[0], chunk_rows)]
+
+        # spawn evita herdar o pool OpenMP do LightGBM do processo pai via fork
+        context = get_context('spawn')
+        initargs = (model_path, compiled, self.x_shm.name, self.shape, self.out_shm.name)
+        with context.Pool(n_workers, initializer=_init_worker, initargs=initargs) as pool:
+            pool.map(_ready, range(n_workers * 4), chunksize=1)
+            start = time.perf_counter()
+            pool.map(_score_slice, bounds, chunksize=1)
+            return time.perf_counter() - start
+
+    def close(self):
+        for shm in (self.x_shm, self.out_shm):
+            shm.close()
+            shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def score_matrix_parallel(X, n_workers=None, model_path=MODEL_PATH, compiled=False,
+                          chunk_rows=CHUNK_ROWS):
+    """
+    Escora uma matriz de features com múltiplos processos
+
+    Args:
+        X: Matriz (linhas x features) na ordem de model.feature_name_
+        n_workers: Número de processos (padrão: todos os núcleos)
+        model_path: Caminho do modelo serializado
+        compiled: Usa o avaliador NumPy compilado em vez do LightGBM
+        chunk_rows: Linhas por tarefa
+
+    Returns:
+        np.ndarray: Probabilidade de inadimplência por linha
+    """
+
+    n_workers = n_workers or os.cpu_count()
+    with SharedFeatureMatrix(X) as shared:
+        shared.run(n_workers, model_path, compiled, chunk_rows)
+        return shared.out.copy()
+
+def benchmark_scaling(X, max_workers=None, model_path=MODEL_PATH, compiled=False,
+                      chunk_rows=CHUNK_ROWS):
+    """
+    Mede linhas/segundo de 1 até max_workers processos sobre a mesma matriz compartilhada
+
+    Args:
+        X: Matriz de features
+        max_workers: Maior número de processos testado (padrão: todos os núcleos)
+
+    Returns:
+        DataFrame: workers, segundos, linhas_por_segundo, speedup e eficiencia
+    """
+
+    max_workers = max_workers or os.cpu_count()
+    results = []
+
+    with SharedFeatureMatrix(X) as shared:
+        for n_workers in range(1, max_workers + 1):
+            seconds = shared.run(n_workers, model_path, compiled, chunk_rows)
+            results.append({'workers': n_workers, 'segundos': seconds,
+                            'linhas_por_segundo': shared.shape[0] / seconds})
+
+    results = pd.DataFrame(results)
+    results['speedup'] = results['linhas_por_segundo'] / results['linhas_por_segundo'].iloc[0]
+    results['eficiencia'] = results['speedup'] / results['workers']
+    return results
+
+def load_feature_matrix(input_path, model_path=MODEL_PATH):
+    """Lê apenas as colunas do modelo de um Parquet como matriz float64"""
+
+    feature_names = list(load_model(model_path).feature_name_)
+    table = pq.read_table(input_path, columns=feature_names)
+    return np.column_stack([table.column(col).to_numpy().astype(np.float64) for col in feature_names])
+
+def main():
+    parser = argparse.ArgumentParser(description="Escalabilidade da escoragem multi-processo")
+    parser.add_argument("input_path", help="Parquet com as features do modelo")
+    parser.add_argument("--model-path", default=MODEL_PATH)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--compiled", action="store_true")
+    args = parser.parse_args()
+
+    X = load_feature_matrix(args.input_path, args.model_path)
+    results = benchmark_scaling(X, args.max_workers, args.model_path, args.compiled, args.chunk_rows)
+    print(results.to_string(index=False, float_format=lambda v: f"{v:,.2f}"))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+import numpy as np
+import pandas as pd
+import polars as pl
+
+from utils.aggregations import AMOUNT_BINS, SCATTER_SAMPLE, SCORE_BINS
+from utils.data_loader import RISK_CATEGORIES
+from utils.portfolio_store import PORTFOLIO_STORE_PATH
+
+# Colunas de valores com estatísticas e histogramas no dashboard
+AMOUNT_COLUMNS = ['loan_amount', 'monthly_income']
+
+def scan_portfolio(path=PORTFOLIO_STORE_PATH, faixas=None, meses=None):
+    """
+    LazyFrame da carteira particionada; os filtros de faixa e mês descartam partições
+
+    Args:
+        path: Diretório da carteira (layout de utils.portfolio_store)
+        faixas: Faixas de risco selecionadas; None não filtra
+        meses: Meses de originação (AAAA-MM) selecionados; None não filtra
+
+    Returns:
+        pl.LazyFrame: Consulta ainda não executada
+    """
+
+    lazy = pl.scan_parquet(f"{path}/**/*.parquet", hive_partitioning=True)
+    if faixas is not None:
+        lazy = lazy.filter(pl.col('risk_category').is_in(list(faixas)))
+    if meses is not None:
+        lazy = lazy.filter(pl.col('origination_month').is_in(list(meses)))
+    return lazy
+
+def _collect_all(queries):
+    # Execução em streaming e em paralelo; a carteira nunca é materializada inteira
+    return pl.collect_all(queries, engine='streaming')
+
+def _category_query(lazy):
+    return lazy.group_by('risk_category').agg(
+        pl.len().alias('count'),
+        pl.col('loan_amount').cast(pl.Float64).sum().alias('exposure'),
+        pl.col('risk_score').cast(pl.Float64).mean().alias('mean_score'),
+        pl.col('loan_amount').cast(pl.Float64).mean().alias('mean_loan'),
+        pl.col('monthly_income').cast(pl.Float64).mean().alias('mean_income')
+    )
+
+def _statistics_query(lazy, columns):
+    aggregations = []
+    for col in columns:
+        value = pl.col(col).cast(pl.Float64)
+        aggregations += [value.mean().alias(f'{col}__mean'), value.std().alias(f'{col}__std'),
+                         value.min().alias(f'{col}__min'), value.max().alias(f'{col}__max')]
+    return lazy.select(aggregations)
+
+def _histogram_query(lazy, column, bins, value_range):
+    low, high = value_range
+    width = (high - low) / bins if high > low else 1.0
+    value = pl.col(column).cast(pl.Float64)
+    # Mesmo critério do np.histogram: o último bin inclui o limite superior
+    index = ((value - low) / width).floor().cast(pl.Int64).clip(0, bins - 1).alias('bin')
+    return (lazy.filter(value.is_between(low, high))
+                .group_by(index)
+                .agg(pl.len().alias('count')))
+
+def _histogram_frame(counts, bins, value_range):
+    low, high = value_range
+    edges = np.linspace(low, high, bins + 1) if high > low else np.linspace(low, low + bins, bins + 1)
+    histogram = np.zeros(bins, dtype=np.int64)
+    histogram[counts['bin'].to_numpy()] = counts['count'].to_numpy()
+    return pd.DataFrame({'bin_start': edges[:-1], 'bin_end': edges[1:], 'count': histogram})
+
+def _category_frame(categories):
+    # Todas as faixas, na ordem de risco, mesmo as ausentes do filtro
+    frame = pd.DataFrame({'category': RISK_CATEGORIES}).merge(
+        categories.to_pandas(), how='left', left_on='category', right_on='risk_category'
+    ).drop(columns='risk_category')
+    frame['count'] = frame['count'].fillna(0).astype(np.int64)
+    frame['exposure'] = frame['exposure'].fillna(0.0)
+    frame.insert(2, 'share', frame['count'] / max(frame['count'].sum(), 1))
+    return frame
+
+def _statistics_frame(statistics, columns):
+    row = statistics.row(0, named=True)
+    return pd.DataFrame([
+        {'column': col, **{stat: row[f'{col}__{stat}'] for stat in ('mean', 'std', 'min', 'max')}}
+        for col in columns
+    ]).astype({'mean': float, 'std': float, 'min': float, 'max': float})
+
+def summarize_portfolio_lazy(path=PORTFOLIO_STORE_PATH, faixas=None, meses=None, score_bins=SCORE_BINS,
+                             amount_bins=AMOUNT_BINS, scatter_sample=SCATTER_SAMPLE, seed=42):
+    """
+    Resumo da carteira para o dashboard com consultas Polars em streaming
+
+    Todas as agregações rodam no Polars sobre o Parquet particionado, com
+    memória limitada independentemente do tamanho da carteira; apenas os
+    resultados pequenos são convertidos para pandas, na fronteira com os gráficos.
+    Duas passadas: a primeira calcula contagens, exposição, estatísticas e o
+    histograma de score; a segunda, os histogramas de valores (que dependem dos
+    extremos) e a amostra do gráfico de dispersão.
+
+    Args:
+        path: Diretório da carteira
+        faixas: Faixas de risco selecionadas; None não filtra
+        meses: Meses de originação selecionados; None não filtra
+        score_bins: Bins do histograma de risk_score em [0, 1]
+        amount_bins: Bins dos histogramas de loan_amount e monthly_income
+        scatter_sample: Tamanho máximo da amostra para o gráfico de dispersão
+        seed: Semente do hash que seleciona a amostra
+
+    Returns:
+        dict: Mesmas chaves de aggregations.summarize_portfolio, mais exposure
+        (por faixa) e statistics (das colunas de valores)
+    """
+
+    lazy = scan_portfolio(path, faixas, meses)
+
+    categories, statistics, score_counts = _collect_all([
+        _category_query(lazy),
+        _statistics_query(lazy, AMOUNT_COLUMNS),
+        _histogram_query(lazy, 'risk_score', score_bins, (0.0, 1.0))
+    ])
+
+    category_frame = _category_frame(categories)
+    statistics_frame = _statistics_frame(statistics, AMOUNT_COLUMNS)
+    n_rows = int(category_frame['count'].sum())
+    # Seleção vazia: histogramas zerados em um intervalo qualquer
+    ranges = {row.column: (row.min, row.max) if n_rows else (0.0, 1.0)
+              for row in statistics_frame.itertuples()}
+
+    # Amostra por hash das linhas: determinística e sem numerar a carteira inteira.
+    # O limite do hash dá scatter_sample linhas em média; head apenas limita o excesso, já
+    # que cortar uma amostra maior favoreceria as primeiras partições lidas
+    sample_query = lazy
+    if n_rows > scatter_sample:
+        limit = int(scatter_sample / n_rows * np.iinfo(np.uint64).max)
+        sample_query = lazy.filter(pl.struct(pl.all()).hash(seed) <= limit)
+    sample_query = sample_query.head(scatter_sample)
+
+    *amount_counts, sample = _collect_all(
+        [_histogram_query(lazy, col, amount_bins, ranges[col]) for col in AMOUNT_COLUMNS] + [sample_query]
+    )
+
+    sample = sample.to_pandas()
+    sample['risk_category'] = pd.Categorical(sample['risk_category'], RISK_CATEGORIES, ordered=True)
+
+    summary = {
+        'n_rows': n_rows,
+        'risk_category': category_frame[['category', 'count', 'share']],
+        'risk_score': _histogram_frame(score_counts, score_bins, (0.0, 1.0)),
+        'exposure': category_frame,
+        'statistics': statistics_frame,
+        'sample': sample
+    }
+    for col, counts in zip(AMOUNT_COLUMNS, amount_counts):
+        summary[col] = _histogram_frame(counts, amount_bins, ranges[col])
+    return summary
@@ -0,0 +1,164 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from utils.data_loader import RISK_CATEGORIES
+
+# Colunas acumuladas por faixa de risco (contagem, soma e soma dos quadrados)
+KPI_METRICS = ['risk_score', 'loan_amount', 'monthly_income']
+
+# Bins do sketch de quantis de risk_score em [0, 1] (erro máximo de 1 / SKETCH_BINS)
+SKETCH_BINS = 1000
+
+class PortfolioKPIs:
+    """
+    Agregados da carteira mantidos de forma incremental
+
+    Guarda, por faixa de risco, a contagem, a soma e a soma dos quadrados de cada
+    métrica, além de um histograma de bins fixos de risk_score que serve como
+    sketch de quantis. Todos os agregados são somas, então um lote pode ser
+    acrescentado (add) ou retirado (remove) em O(linhas do lote), e um
+    rescoring é a retirada das linhas antigas seguida da inclusão das novas.
+    """
+
+    def __init__(self, categories=RISK_CATEGORIES, metrics=KPI_METRICS, sketch_bins=SKETCH_BINS):
+        self.categories = list(categories)
+        self.metrics = list(metrics)
+        self.sketch_bins = sketch_bins
+        self.counts = np.zeros(len(self.categories), dtype=np.int64)
+        self.sums = np.zeros((len(self.categories), len(self.metrics)))
+        self.sums_sq = np.zeros((len(self.categories), len(self.metrics)))
+        self.sketch = np.zeros((len(self.categories), sketch_bins), dtype=np.int64)
+
+    def _batch_aggregates(self, batch):
+        codes = pd.Categorical(batch['risk_category'], categories=self.categories).codes.astype(np.int64)
+        valid = codes >= 0
+        codes = codes[valid]
+        n_cat = len(self.categories)
+
+        counts = np.bincount(codes, minlength=n_cat)
+        sums = np.empty((n_cat, len(self.metrics)))
+        sums_sq = np.empty_like(sums)
+        for j, metric in enumerate(self.metrics):
+            values = np.asarray(batch[metric], dtype=np.float64)[valid]
+            sums[:, j] = np.bincount(codes, weights=values, minlength=n_cat)
+            sums_sq[:, j] = np.bincount(codes, weights=values * values, minlength=n_cat)
+
+        scores = np.asarray(batch['risk_score'], dtype=np.float64)[valid]
+        bins = np.clip((scores * self.sketch_bins).astype(np.int64), 0, self.sketch_bins - 1)
+        sketch = np.bincount(codes * self.sketch_bins + bins,
+                             minlength=n_cat * self.sketch_bins).reshape(n_cat, self.sketch_bins)
+        return counts, sums, sums_sq, sketch
+
+    def add(self, batch):
+        """
+        Acrescenta um lote de clientes
+
+        Args:
+            batch: DataFrame com risk_category e as colunas de metrics
+        """
+
+        counts, sums, sums_sq, sketch = self._batch_aggregates(batch)
+        self.counts += counts
+        self.sums += sums
+        self.sums_sq += sums_sq
+        self.sketch += sketch
+        return self
+
+    def remove(self, batch):
+        """Retira um lote previamente acrescentado (ex.: linhas com score antigo)"""
+
+        counts, sums, sums_sq, sketch = self._batch_aggregates(batch)
+        if np.any(counts > self.counts) or np.any(sketch > self.sketch):
+            raise ValueError("O lote contém linhas que não estão nos agregados")
+        self.counts -= counts
+        self.sums -= sums
+        self.sums_sq -= sums_sq
+        self.sketch -= sketch
+        return self
+
+    def rescore(self, old_batch, new_batch):
+        """Substitui as linhas de old_batch pelas mesmas linhas reescoradas em new_batch"""
+
+        return self.remove(old_batch).add(new_batch)
+
+    @property
+    def n_rows(self):
+        return int(self.counts.sum())
+
+    def summary(self):
+        """
+        KPIs por faixa de risco
+
+        Returns:
+            DataFrame: category, count, share e média e desvio padrão de cada métrica
+        """
+
+        counts = self.counts.astype(np.float64)
+        safe_counts = np.maximum(counts, 1.0)[:, None]
+        means = self.sums / safe_counts
+        # Variância pela soma dos quadrados; resíduos negativos de arredondamento viram 0
+        stds = np.sqrt(np.maximum(self.sums_sq / safe_counts - means ** 2, 0.0))
+
+        summary = pd.DataFrame({
+            'category': self.categories,
+            'count': self.counts,
+            'share': counts / max(self.n_rows, 1)
+        })
+        for j, metric in enumerate(self.metrics):
+            summary[f'{metric}_mean'] = np.where(counts > 0, means[:, j], np.nan)
+            summary[f'{metric}_std'] = np.where(counts > 0, stds[:, j], np.nan)
+        return summary
+
+    def total(self, metric):
+        """Soma de uma métrica em toda a carteira (ex.: exposição total em loan_amount)"""
+
+        return float(self.sums[:, self.metrics.index(metric)].sum())
+
+    def quantile(self, q, category=None):
+        """
+        Quantis aproximados de risk_score pelo sketch (interpolação linear dentro do bin)
+
+        Args:
+            q: Quantil (escalar ou array) em [0, 1]
+            category: Faixa de risco; None usa toda a carteira
+
+        Returns:
+            float ou np.ndarray: Quantis (NaN quando não há clientes)
+        """
+
+        histogram = self.sketch.sum(axis=0) if category is None \
+            else self.sketch[self.categories.index(category)]
+        total = histogram.sum()
+        if total == 0:
+            return np.full(np.shape(q), np.nan)[()]
+
+        cumulative = np.cumsum(histogram)
+        target = np.asarray(q, dtype=np.float64) * total
+        index = np.minimum(np.searchsorted(cumulative, target, side='left'), self.sketch_bins - 1)
+        # Quantil 0 (e alvos em bins iniciais vazios) começa no primeiro bin com clientes
+        index = np.maximum(index, np.argmax(histogram > 0))
+        before = np.where(index > 0, cumulative[index - 1], 0)
+        fraction = np.clip((target - before) / np.maximum(histogram[index], 1), 0.0, 1.0)
+        return ((index + fraction) / self.sketch_bins)[()]
+
+    def save(self, path):
+        """Grava os agregados em .npz (escrita atômica)"""
+
+        temp_path = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(temp_path, categories=np.array(self.categories), metrics=np.array(self.metrics),
+                 counts=self.counts, sums=self.sums, sums_sq=self.sums_sq, sketch=self.sketch)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Carrega agregados gravados por save"""
+
+        with np.load(path) as data:
+            kpis = cls(data['categories'].tolist(), data['metrics'].tolist(), data['sketch'].shape[1])
+            kpis.counts = data['counts']
+            kpis.sums = data['sums']
+            kpis.sums_sq = data['sums_sq']
+            kpis.sketch = data['sketch']
+        return kpis
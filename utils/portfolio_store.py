@@ -0,0 +1,195 @@
+import os
+import shutil
+import uuid
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from utils.data_loader import RISK_CATEGORIES, generate_sample_portfolio
+from utils.portfolio_kpis import KPI_METRICS, PortfolioKPIs
+
+# Diretório da carteira persistida (fora do versionamento)
+PORTFOLIO_STORE_PATH = ".cache/portfolio"
+
+# Colunas de partição, na ordem dos diretórios (layout hive: coluna=valor)
+PARTITION_COLUMNS = ['risk_category', 'origination_month']
+
+# Clientes gerados e gravados por vez ao montar a carteira sintética
+STORE_CHUNK_ROWS = 1_000_000
+
+# Agregados incrementais da carteira, gravados junto dela (prefixo '_' fica fora da leitura)
+KPI_FILE = '_kpis.npz'
+
+def _partitioning():
+    # Valores das partições descobertos a partir dos diretórios
+    return ds.HivePartitioning.discover(infer_dictionary=True)
+
+def _filter_expression(filters):
+    # Um filtro 'in' com lista vazia não seleciona nada (o pyarrow não tipa listas vazias)
+    if any(isinstance(f, tuple) and f[1] == 'in' and len(f[2]) == 0 for f in filters):
+        return ds.scalar(False)
+    return pq.filters_to_expression(filters)
+
+def write_portfolio(portfolio, path=PORTFOLIO_STORE_PATH):
+    """
+    Acrescenta clientes à carteira, particionada por faixa de risco e mês de originação
+
+    Cada chamada grava arquivos novos (nome único) dentro das partições, sem
+    reescrever os existentes.
+
+    Args:
+        portfolio: DataFrame com as colunas de PARTITION_COLUMNS
+        path: Diretório da carteira
+    """
+
+    table = pa.Table.from_pandas(portfolio, preserve_index=False).replace_schema_metadata(None)
+    for col in PARTITION_COLUMNS:
+        table = table.set_column(table.schema.get_field_index(col), col, table[col].cast(pa.string()))
+
+    ds.write_dataset(
+        table,
+        path,
+        format='parquet',
+        partitioning=PARTITION_COLUMNS,
+        partitioning_flavor='hive',
+        basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+        existing_data_behavior='overwrite_or_ignore'
+    )
+
+def build_sample_store(n_samples, path=PORTFOLIO_STORE_PATH, chunk_rows=STORE_CHUNK_ROWS, seed=42):
+    """
+    Monta (ou remonta) a carteira sintética em disco, em blocos de chunk_rows clientes
+
+    A carteira é gravada em um diretório temporário e só então substitui a
+    anterior, de modo que leitores nunca veem uma carteira parcial.
+
+    Args:
+        n_samples: Número de clientes
+        path: Diretório da carteira
+        chunk_rows: Clientes gerados por bloco (limita a memória usada)
+        seed: Semente do primeiro bloco (os seguintes usam seed + i)
+    """
+
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    shutil.rmtree(temp_path, ignore_errors=True)
+
+    # Os KPIs são acumulados durante a gravação, sem nova leitura da carteira
+    kpis = PortfolioKPIs()
+    for i, start in enumerate(range(0, n_samples, chunk_rows)):
+        chunk = generate_sample_portfolio(min(chunk_rows, n_samples - start), seed + i)
+        write_portfolio(chunk, temp_path)
+        kpis.add(chunk)
+    kpis.save(os.path.join(temp_path, KPI_FILE))
+
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(temp_path, path)
+
+def append_to_store(batch, path=PORTFOLIO_STORE_PATH):
+    """
+    Acrescenta um lote à carteira e atualiza os KPIs persistidos com o mesmo lote
+
+    Args:
+        batch: DataFrame no formato de generate_sample_portfolio
+        path: Diretório da carteira
+
+    Returns:
+        PortfolioKPIs: Agregados atualizados
+    """
+
+    kpis = load_store_kpis(path) if os.path.exists(path) else PortfolioKPIs()
+    write_portfolio(batch, path)
+    kpis.add(batch)
+    kpis.save(os.path.join(path, KPI_FILE))
+    return kpis
+
+def load_store_kpis(path=PORTFOLIO_STORE_PATH):
+    """
+    KPIs persistidos da carteira; na ausência do arquivo, são reconstruídos por
+    uma varredura em lotes (apenas das colunas necessárias) e gravados
+
+    Returns:
+        PortfolioKPIs: Agregados da carteira
+    """
+
+    kpi_path = os.path.join(path, KPI_FILE)
+    if os.path.exists(kpi_path):
+        return PortfolioKPIs.load(kpi_path)
+
+    kpis = PortfolioKPIs()
+    for batch in open_portfolio_store(path).to_batches(columns=['risk_category'] + KPI_METRICS):
+        kpis.add(batch.to_pandas())
+    kpis.save(kpi_path)
+    return kpis
+
+def store_version(path=PORTFOLIO_STORE_PATH):
+    """
+    Marca de versão da carteira: muda a cada gravação dos KPIs (build_sample_store e append_to_store)
+
+    Usada como parte da chave de caches de resultados derivados da carteira.
+
+    Returns:
+        tuple: (mtime em ns, tamanho) do arquivo de KPIs; None quando ainda não existe
+    """
+
+    kpi_path = os.path.join(path, KPI_FILE)
+    if not os.path.exists(kpi_path):
+        return None
+    stat = os.stat(kpi_path)
+    return stat.st_mtime_ns, stat.st_size
+
+def open_portfolio_store(path=PORTFOLIO_STORE_PATH):
+    """Dataset pyarrow da carteira; nenhum dado é lido até a consulta"""
+
+    return ds.dataset(path, format='parquet', partitioning=_partitioning())
+
+def store_partition_values(path=PORTFOLIO_STORE_PATH):
+    """
+    Valores existentes de cada coluna de partição, lidos apenas dos diretórios
+
+    Returns:
+        dict: Coluna -> lista ordenada de valores
+    """
+
+    dataset = open_portfolio_store(path)
+    names = dataset.partitioning.schema.names
+    values = {name: sorted(dictionary.to_pylist())
+              for name, dictionary in zip(names, dataset.partitioning.dictionaries)}
+
+    # Faixas de risco na ordem de risco, não alfabética
+    if 'risk_category' in values:
+        values['risk_category'] = [cat for cat in RISK_CATEGORIES if cat in values['risk_category']]
+    return values
+
+def load_portfolio(path=PORTFOLIO_STORE_PATH, columns=None, filters=None):
+    """
+    Lê a carteira com projeção de colunas e filtros aplicados na varredura
+
+    Filtros nas colunas de partição descartam diretórios inteiros; nas demais
+    colunas, usam as estatísticas dos row groups. Apenas as colunas pedidas são
+    lidas do disco.
+
+    Args:
+        path: Diretório da carteira
+        columns: Colunas retornadas; None retorna todas
+        filters: Filtros no formato de pandas.read_parquet, ex.:
+            [('risk_category', 'in', ['Alto Risco']), ('origination_month', '>=', '2025-01')]
+
+    Returns:
+        DataFrame: Clientes selecionados, com as partições como categorias
+    """
+
+    dataset = open_portfolio_store(path)
+    expression = _filter_expression(filters) if filters else None
+    portfolio = dataset.to_table(columns=columns, filter=expression).to_pandas()
+
+    if 'risk_category' in portfolio.columns:
+        portfolio['risk_category'] = portfolio['risk_category'].astype(
+            pd.CategoricalDtype(RISK_CATEGORIES, ordered=True))
+    if 'origination_month' in portfolio.columns:
+        months = portfolio['origination_month'].astype('category')
+        portfolio['origination_month'] = months.cat.reorder_categories(
+            sorted(months.cat.categories), ordered=True)
+
+    return portfolio
@@ -0,0 +1,207 @@
+from datetime import date
+
+import joblib
+import pandas as pd
+import polars as pl
+
+# Artefato salvo pelo notebook ao lado de model_smote.pkl
+PREPROCESSOR_PATH = "notebook/preprocessor.pkl"
+
+# Colunas removidas no notebook (multicolinearidade, excesso de nulos e datas de controle)
+DROP_COLUMNS = [
+    'credamount_770A', 'avginstallast24m_3658937A',
+    'datelastunpaid_3546854D', 'lastrepayingdate_696D',
+    'date_decision', 'MONTH', 'WEEK_NUM'
+]
+FLAG_COLUMNS = ['equalitydataagreement_891L']
+DATE_COLUMN = 'lastapprdate_640D'
+DATE_REFERENCE = date(2024, 1, 1)
+LABEL_COLUMNS = ['lastcancelreason_561M', 'lastrejectreason_759M', 'riskassesment_302T']
+ONE_HOT_COLUMNS = ['education_1103M', 'maritalst_385M']
+
+# Colunas repassadas sem transformação, na mesma posição de train_model_um.parquet
+PASSTHROUGH_COLUMNS = ['case_id', 'target']
+
+def _date_feature_expressions(date_col, max_date):
+    """Mesmas features de extract_date_features do notebook, com a data máxima do treino"""
+
+    col = pl.col(date_col)
+    return [
+        col.dt.year().alias(f"{date_col}_year"),
+        col.dt.month().alias(f"{date_col}_month"),
+        col.dt.day().alias(f"{date_col}_day"),
+        col.dt.weekday().alias(f"{date_col}_weekday"),
+        col.dt.quarter().alias(f"{date_col}_quarter"),
+        (col - pl.lit(DATE_REFERENCE)).dt.total_days().alias(f"{date_col}_days_since_ref"),
+        (pl.lit(max_date) - col).dt.total_days().alias(f"{date_col}_days_ago")
+    ]
+
+class CreditPreprocessor:
+    """
+    Pipeline de features do notebook em um único transformador Polars
+
+    Reproduz, com estatísticas aprendidas no fit, as etapas do notebook:
+    remoção de colunas, flags, extract_date_features + moda das partes da data,
+    preenchimento das colunas M, LabelEncoder em LABEL_COLUMNS, OneHotEncoder
+    em ONE_HOT_COLUMNS e mediana das numéricas. O transform é composto apenas
+    de expressões vetorizadas, com custo linear no tamanho do lote.
+
+    Diferença em relação ao notebook: colunas M de texto são preenchidas com a
+    moda em vez do sorteio proporcional, para que o transform seja determinístico.
+    """
+
+    def __init__(self):
+        self.max_date_ = None
+        self.date_modes_ = {}
+        self.category_modes_ = {}
+        self.label_classes_ = {}
+        self.one_hot_categories_ = {}
+        self.medians_ = {}
+        self.input_dtypes_ = {}
+        self.feature_names_ = []
+        self.feature_dtypes_ = {}
+
+    def _prepare(self, df):
+        if isinstance(df, pd.DataFrame):
+            df = pl.from_pandas(df)
+
+        # Colunas brutas ausentes no lote chegam nulas e são preenchidas pelas estatísticas do fit
+        missing = [col for col in self.input_dtypes_ if col not in df.columns]
+        if missing:
+            df = df.with_columns([pl.lit(None, dtype=self.input_dtypes_[col]).alias(col) for col in missing])
+
+        df = df.drop([col for col in DROP_COLUMNS if col in df.columns])
+        df = df.with_columns([pl.col(col).cast(pl.Int64).fill_null(0) for col in FLAG_COLUMNS])
+
+        if df.schema[DATE_COLUMN] in (pl.Utf8, pl.Categorical):
+            df = df.with_columns(
+                pl.col(DATE_COLUMN).cast(pl.Utf8).str.strptime(pl.Date, format="%Y-%m-%d", strict=False)
+            )
+        return df
+
+    def _text_expression(self, col):
+        return pl.col(col).cast(pl.Utf8).fill_null('Unknown')
+
+    def fit(self, df):
+        """
+        Aprende as estatísticas do pipeline a partir do DataFrame bruto do notebook
+
+        Args:
+            df: DataFrame Polars (ou pandas) com as variáveis selecionadas, case_id e target
+
+        Returns:
+            CreditPreprocessor: O próprio transformador ajustado
+        """
+
+        if isinstance(df, pd.DataFrame):
+            df = pl.from_pandas(df)
+        self.input_dtypes_ = {col: dtype for col, dtype in df.schema.items()
+                              if col not in PASSTHROUGH_COLUMNS}
+
+        df = self._prepare(df)
+
+        # Features de data
+        self.max_date_ = df[DATE_COLUMN].max()
+        df = df.with_columns(_date_feature_expressions(DATE_COLUMN, self.max_date_))
+        date_features = [col for col in df.columns if col.startswith(DATE_COLUMN) and col != DATE_COLUMN]
+        for col in date_features:
+            moda = df[col].drop_nulls().mode().sort()
+            self.date_modes_[col] = moda[0] if len(moda) > 0 else -1
+        df = df.with_columns([pl.col(col).fill_null(self.date_modes_[col]) for col in date_features])
+        df = df.drop(DATE_COLUMN)
+
+        # Colunas M de texto
+        for col in df.columns:
+            if col.endswith('M') and df.schema[col] in (pl.Utf8, pl.Categorical):
+                moda = df[col].cast(pl.Utf8).drop_nulls().mode().sort()
+                self.category_modes_[col] = moda[0] if len(moda) > 0 else 'Unknown'
+        df = df.with_columns([pl.col(col).cast(pl.Utf8).fill_null(value)
+                              for col, value in self.category_modes_.items()])
+
+        # Label Encoding (classes ordenadas, como o LabelEncoder)
+        for col in LABEL_COLUMNS:
+            self.label_classes_[col] = df.select(self._text_expression(col)).to_series().unique().sort().to_list()
+        df = df.with_columns(self._label_expressions())
+
+        # One Hot Encoding (categorias ordenadas, como o OneHotEncoder)
+        for col in ONE_HOT_COLUMNS:
+            self.one_hot_categories_[col] = df.select(self._text_expression(col)).to_series().unique().sort().to_list()
+        df = df.with_columns(self._one_hot_expressions()).drop(ONE_HOT_COLUMNS)
+
+        # Mediana das numéricas
+        self.feature_names_ = [col for col in df.columns if col not in PASSTHROUGH_COLUMNS]
+        for col in self.feature_names_:
+            if df.schema[col].is_numeric():
+                self.medians_[col] = df[col].median()
+        self.feature_dtypes_ = {col: df.schema[col] for col in self.feature_names_}
+
+        return self
+
+    def _label_expressions(self):
+        return [
+            self._text_expression(col).replace_strict(
+                {value: code for code, value in enumerate(classes)}, default=None, return_dtype=pl.Int64
+            ).alias(col)
+            for col, classes in self.label_classes_.items()
+        ]
+
+    def _one_hot_expressions(self):
+        return [
+            (self._text_expression(col) == category).cast(pl.Float64).alias(f"{col}_{category}")
+            for col, categories in self.one_hot_categories_.items()
+            for category in categories
+        ]
+
+    def transform(self, df):
+        """
+        Aplica o pipeline ajustado a um lote de solicitantes brutos
+
+        Args:
+            df: DataFrame Polars (ou pandas) no formato bruto do notebook
+
+        Returns:
+            pl.DataFrame: case_id/target (se presentes) seguidos das features na ordem do modelo
+        """
+
+        if self.max_date_ is None:
+            raise ValueError("CreditPreprocessor precisa ser ajustado com fit antes do transform")
+
+        df = self._prepare(df)
+        passthrough = [col for col in PASSTHROUGH_COLUMNS if col in df.columns]
+
+        df = df.with_columns(_date_feature_expressions(DATE_COLUMN, self.max_date_))
+        df = df.with_columns(
+            [pl.col(col).fill_null(value) for col, value in self.date_modes_.items()] +
+            [pl.col(col).cast(pl.Utf8).fill_null(value) for col, value in self.category_modes_.items()]
+        )
+        df = df.with_columns(self._label_expressions() + self._one_hot_expressions())
+
+        return df.select(
+            [pl.col(col) for col in passthrough] +
+            [
+                # Preenchimento em Float64, como o fillna(median) do pandas no notebook: a mediana
+                # fracionária de uma coluna inteira não é truncada
+                pl.col(col).cast(pl.Float64).fill_null(self.medians_[col]).alias(col)
+                if col in self.medians_ else pl.col(col)
+                for col in self.feature_names_
+            ]
+        )
+
+    def fit_transform(self, df):
+        return self.fit(df).transform(df)
+
+    def save(self, path=PREPROCESSOR_PATH):
+        """Serializa o transformador ajustado com joblib, como o modelo"""
+        joblib.dump(self, path)
+
+def load_preprocessor(path=PREPROCESSOR_PATH):
+    """
+    Carrega o pipeline salvo pelo notebook
+
+    Args:
+        path: Caminho do arquivo .pkl
+
+    Returns:
+        CreditPreprocessor: Transformador ajustado
+    """
+    return joblib.load(path)
@@ -0,0 +1,109 @@
+import argparse
+import time
+
+import numpy as np
+
+from utils.calculations import calculate_roi
+from utils.cashflow import LGD_PADRAO, PRAZO_PADRAO, SAFRAS_POR_MES, calculate_roi_cashflow
+from utils.data_loader import ROI_SCENARIO_COLUMNS, read_roi_scenarios
+
+# Cenários avaliados por bloco no fluxo de caixa (limita a matriz cenários x meses)
+CHUNK_ROWS = 50_000
+
+# Premissas que cada cenário pode informar; na ausência, valem os padrões da linha de comando
+OPTIONAL_COLUMNS = ['investimento_inicial', 'meses', 'prazo', 'lgd']
+
+# Saídas gravadas de cada cálculo
+RESULT_COLUMNS = ['economia_total', 'economia_mensal', 'roi_percentual', 'payback_meses',
+                  'perdas_atuais', 'perdas_com_modelo']
+
+def _with_defaults(scenarios, investimento_inicial, meses, prazo, lgd):
+    scenarios = scenarios.copy()
+    defaults = {'investimento_inicial': investimento_inicial, 'meses': meses, 'prazo': prazo, 'lgd': lgd}
+    for col, value in defaults.items():
+        if col not in scenarios.columns:
+            scenarios[col] = value
+        else:
+            scenarios[col] = scenarios[col].fillna(value)
+    scenarios[['meses', 'prazo']] = scenarios[['meses', 'prazo']].astype(np.int64)
+    return scenarios
+
+def run_scenarios(scenarios, investimento_inicial=500000, meses=12, prazo=PRAZO_PADRAO, lgd=LGD_PADRAO,
+                  safras_por_mes=SAFRAS_POR_MES, chunk_rows=CHUNK_ROWS):
+    """
+    Avalia todos os cenários com o ROI simples e com o fluxo de caixa por safra
+
+    O ROI simples é uma única chamada vetorizada de calculate_roi. O fluxo de
+    caixa é vetorizado por grupo de (meses, prazo), que definem o tamanho do
+    cronograma, em blocos de chunk_rows cenários.
+
+    Args:
+        scenarios: DataFrame com ROI_SCENARIO_COLUMNS (e, opcionalmente, cenario e OPTIONAL_COLUMNS)
+        investimento_inicial: Investimento padrão em R$
+        meses: Período de análise padrão em meses
+        prazo: Prazo padrão dos empréstimos
+        lgd: Perda dada a inadimplência padrão (0 a 1)
+        safras_por_mes: Safras originadas por mês no fluxo de caixa
+        chunk_rows: Cenários por bloco no fluxo de caixa
+
+    Returns:
+        DataFrame: Premissas de cada cenário, resultados simples_* e fluxo_*
+    """
+
+    scenarios = _with_defaults(scenarios, investimento_inicial, meses, prazo, lgd).reset_index(drop=True)
+    inputs = {col: scenarios[col].to_numpy(dtype=np.float64) for col in ROI_SCENARIO_COLUMNS}
+
+    simples = calculate_roi(**inputs,
+                            investimento_inicial=scenarios['investimento_inicial'].to_numpy(dtype=np.float64),
+                            meses=scenarios['meses'].to_numpy(dtype=np.float64))
+
+    fluxo = {col: np.empty(len(scenarios)) for col in RESULT_COLUMNS + ['juros_adicionais']}
+    for (grupo_meses, grupo_prazo), index in scenarios.groupby(['meses', 'prazo']).indices.items():
+        for start in range(0, index.size, chunk_rows):
+            rows = index[start:start + chunk_rows]
+            resultado = calculate_roi_cashflow(
+                **{col: values[rows] for col, values in inputs.items()},
+                investimento_inicial=scenarios['investimento_inicial'].to_numpy(dtype=np.float64)[rows],
+                meses=int(grupo_meses),
+                prazo=int(grupo_prazo),
+                lgd=scenarios['lgd'].to_numpy(dtype=np.float64)[rows],
+                safras_por_mes=safras_por_mes
+            )
+            for col in RESULT_COLUMNS:
+                fluxo[col][rows] = resultado[col]
+            fluxo['juros_adicionais'][rows] = resultado['juros_com_modelo'] - resultado['juros_atuais']
+
+    results = scenarios.copy()
+    for col in RESULT_COLUMNS:
+        results[f'simples_{col}'] = simples[col]
+    for col, values in fluxo.items():
+        results[f'fluxo_{col}'] = values
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Avaliação em lote de cenários de ROI (sem interface)")
+    parser.add_argument("input_path", help="CSV ou Parquet de cenários")
+    parser.add_argument("output_path", help="Parquet de saída")
+    parser.add_argument("--investimento", type=float, default=500000,
+                        help="Investimento quando o cenário não informa investimento_inicial")
+    parser.add_argument("--meses", type=int, default=12,
+                        help="Período de análise quando o cenário não informa meses")
+    parser.add_argument("--prazo", type=int, default=PRAZO_PADRAO,
+                        help="Prazo dos empréstimos quando o cenário não informa prazo")
+    parser.add_argument("--lgd", type=float, default=LGD_PADRAO,
+                        help="Perda dada a inadimplência quando o cenário não informa lgd")
+    parser.add_argument("--safras-diarias", action="store_true",
+                        help="Fluxo de caixa com safras diárias em vez de mensais")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    scenarios = read_roi_scenarios(args.input_path)
+    results = run_scenarios(scenarios, args.investimento, args.meses, args.prazo, args.lgd,
+                            30 if args.safras_diarias else 1, args.chunk_rows)
+    results.to_parquet(args.output_path, index=False)
+
+    print(f"{len(results)} cenários avaliados em {time.perf_counter() - inicio:.2f}s -> {args.output_path}")
+
+if __name__ == "__main__":
+    main()
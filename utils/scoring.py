@@ -0,0 +1,145 @@
+import argparse
+import os
+
+import joblib
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from utils.calculations import THRESHOLD_MODELO
+
+# Artefato do modelo treinado no notebook
+MODEL_PATH = "notebook/model_smote.pkl"
+
+# Linhas lidas por vez do Parquet de entrada
+BATCH_SIZE = 100_000
+
+# Colunas de identificação repassadas para a saída quando presentes
+ID_COLUMNS = ['case_id']
+
+_model_cache = {}
+
+def load_model(model_path=MODEL_PATH, reload=False):
+    """
+    Carrega o LGBMClassifier serializado, uma única vez por caminho
+
+    Args:
+        model_path: Caminho do arquivo .pkl gerado pelo notebook
+        reload: Relê o arquivo mesmo que o caminho já esteja carregado (ex.: após retreino)
+
+    Returns:
+        LGBMClassifier: Modelo pronto para predict_proba
+    """
+
+    path = os.path.abspath(model_path)
+    if reload or path not in _model_cache:
+        _model_cache[path] = joblib.load(path)
+
+    return _model_cache[path]
+
+def score_frame(df, model, threshold=THRESHOLD_MODELO, explainer=None):
+    """
+    Escora um DataFrame já no layout de features do modelo
+
+    Args:
+        df: DataFrame com as colunas de model.feature_name_ (e opcionalmente case_id)
+        model: Modelo com feature_name_ e predict_proba
+        threshold: Probabilidade a partir da qual o cliente é classificado como inadimplente
+        explainer: ReasonExplainer opcional; adiciona motivo_1..k às linhas recusadas
+
+    Returns:
+        DataFrame: Colunas de identificação, score, decisão (aprovado) e motivos
+    """
+
+    features = df[list(model.feature_name_)]
+    proba = model.predict_proba(features)[:, 1]
+
+    scored = df[[col for col in ID_COLUMNS if col in df.columns]].reset_index(drop=True)
+    scored['score'] = proba
+    # Mesma regra do notebook: score >= threshold -> inadimplente -> crédito negado
+    scored['aprovado'] = proba < threshold
+
+    if explainer is not None:
+        # Motivos só são exigidos (e calculados) para as recusas
+        declined = np.flatnonzero(~scored['aprovado'].to_numpy())
+        reasons = explainer.explain(features.iloc[declined])
+        for rank in range(1, explainer.n_reasons + 1):
+            column = np.full(len(scored), None, dtype=object)
+            column[declined] = reasons[f'motivo_{rank}'].to_numpy()
+            scored[f'motivo_{rank}'] = column
+
+    return scored
+
+def score_parquet(input_path, output_path, model_path=MODEL_PATH, batch_size=BATCH_SIZE,
+                  threshold=THRESHOLD_MODELO, scorer=None, explainer=None):
+    """
+    Escora um Parquet de solicitantes em lotes de tamanho fixo
+
+    Lê apenas as colunas usadas pelo modelo, processa um lote por vez e grava
+    cada lote como um row group da saída, sem carregar o arquivo inteiro em memória.
+
+    Args:
+        input_path: Parquet com o mesmo schema de notebook/train_model_um.parquet
+        output_path: Parquet de saída com case_id, score e aprovado
+        model_path: Caminho do modelo serializado
+        batch_size: Número de linhas por lote
+        threshold: Threshold de decisão do modelo
+        scorer: Modelo alternativo já carregado (ex.: CompiledModel); ignora model_path
+        explainer: ReasonExplainer opcional para gravar os motivos das recusas
+
+    Returns:
+        int: Total de linhas escoradas
+    """
+
+    model = scorer if scorer is not None else load_model(model_path)
+    parquet_file = pq.ParquetFile(input_path)
+    input_schema = parquet_file.schema_arrow
+
+    id_columns = [col for col in ID_COLUMNS if col in input_schema.names]
+    columns = id_columns + [col for col in model.feature_name_ if col not in id_columns]
+
+    output_schema = pa.schema(
+        [input_schema.field(col) for col in id_columns] +
+        [pa.field('score', pa.float64()), pa.field('aprovado', pa.bool_())] +
+        ([pa.field(f'motivo_{rank}', pa.string()) for rank in range(1, explainer.n_reasons + 1)]
+         if explainer is not None else [])
+    )
+
+    total_rows = 0
+    with pq.ParquetWriter(output_path, output_schema) as writer:
+        for batch in parquet_file.iter_batches(batch_size=batch_size, columns=columns):
+            scored = score_frame(batch.to_pandas(), model, threshold, explainer)
+            writer.write_table(pa.Table.from_pandas(scored, schema=output_schema, preserve_index=False))
+            total_rows += len(scored)
+
+    return total_rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Escoragem em lote com o modelo LightGBM + SMOTE")
+    parser.add_argument("input_path", help="Parquet de entrada")
+    parser.add_argument("output_path", help="Parquet de saída")
+    parser.add_argument("--model-path", default=MODEL_PATH)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--threshold", type=float, default=THRESHOLD_MODELO)
+    parser.add_argument("--compiled", action="store_true",
+                        help="Usa o avaliador NumPy compilado em vez do LightGBM")
+    parser.add_argument("--reasons", type=int, default=0, metavar="K",
+                        help="Grava os K principais motivos (TreeSHAP) de cada recusa")
+    args = parser.parse_args()
+
+    scorer = None
+    if args.compiled:
+        from utils.compiled_model import load_compiled_model
+        scorer = load_compiled_model(args.model_path)
+
+    explainer = None
+    if args.reasons > 0:
+        from utils.explanations import load_explainer
+        explainer = load_explainer(args.model_path, args.reasons)
+
+    total_rows = score_parquet(args.input_path, args.output_path, args.model_path,
+                               args.batch_size, args.threshold, scorer, explainer)
+    print(f"{total_rows} linhas escoradas em {args.output_path}")
+
+if __name__ == "__main__":
+    main()
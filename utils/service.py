@@ -0,0 +1,323 @@
+import argparse
+import asyncio
+import json
+import math
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from utils.cache import MAX_ENTRIES, TTL_SECONDS, ScoreCache
+from utils.calculations import THRESHOLD_MODELO, classify_risk
+from utils.scoring import MODEL_PATH, load_model
+
+MAX_BATCH_SIZE = 64
+MAX_WAIT_MS = 5.0
+MAX_BODY_BYTES = 1_000_000
+
+HTTP_STATUS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+               413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+class MicroBatcher:
+    """
+    Agrupa requisições concorrentes em uma única chamada vetorizada de predict_proba
+
+    Cada lote fecha ao atingir max_batch_size ou após max_wait_ms desde a primeira
+    requisição. A janela é adaptativa: com tráfego baixo (último lote unitário) a
+    requisição é escorada sem espera, e a janela só é usada quando há concorrência.
+    O modelo é qualquer objeto com feature_name_ e predict_proba, o que permite
+    testar o serviço inteiro offline com um modelo falso. Com um ScoreCache,
+    solicitantes repetidos são respondidos sem entrar na fila; com model_loader,
+    a troca do arquivo do modelo detectada pelo cache recarrega o modelo.
+    """
+
+    def __init__(self, model, max_batch_size=MAX_BATCH_SIZE, max_wait_ms=MAX_WAIT_MS,
+                 threshold=THRESHOLD_MODELO, preprocessor=None, cache=None, model_loader=None):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.threshold = threshold
+        self.preprocessor = preprocessor
+        self.cache = cache
+        self.model_loader = model_loader
+        if cache is not None and model_loader is not None:
+            cache.on_model_change = self._reload_model
+        self.stats = {'requests': 0, 'batches': 0, 'max_batch_size': 0}
+        self._queue = None
+        self._task = None
+        self._last_batch_size = 1
+        # Um único worker serializa as chamadas ao modelo fora do event loop
+        self._executor = ThreadPoolExecutor(max_workers=1)
+
+    def _reload_model(self, model_path):
+        # Chamado pelo cache antes de descartar as entradas: novos scores já usam o novo modelo
+        self.model = self.model_loader(model_path, reload=True)
+
+    async def start(self):
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._executor.shutdown(wait=False)
+
+    def validate(self, features):
+        """Retorna uma mensagem de erro ou None quando o payload é escorável"""
+
+        if not isinstance(features, dict):
+            return "O corpo deve ser um objeto JSON com as features do solicitante"
+        if self.preprocessor is None:
+            missing = [col for col in self.model.feature_name_ if col not in features]
+            if missing:
+                return f"Features ausentes: {', '.join(missing[:10])}"
+
+            # Valores convertidos para float aqui, para que um payload inválido não derrube o lote
+            invalid = []
+            for col in self.model.feature_name_:
+                try:
+                    value = float(features[col])
+                except (TypeError, ValueError):
+                    value = math.nan
+                if math.isfinite(value):
+                    features[col] = value
+                else:
+                    invalid.append(col)
+            if invalid:
+                return f"Features não numéricas ou não finitas: {', '.join(invalid[:10])}"
+        return None
+
+    async def score(self, features):
+        """
+        Escora um solicitante, aguardando o lote em que ele for incluído
+
+        Args:
+            features: Dicionário com as features do solicitante
+
+        Returns:
+            dict: score, aprovado, classificacao_risco e cor_risco
+        """
+
+        if self.cache is not None:
+            cached = self.cache.get(features)
+            if cached is not None:
+                return cached
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((features, future))
+        result = await future
+
+        if self.cache is not None:
+            self.cache.put(features, result)
+        return result
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+
+        while len(batch) < self.max_batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+
+        if self._last_batch_size > 1 or len(batch) > 1:
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+        return batch
+
+    def _predict(self, records):
+        frame = pd.DataFrame.from_records(records)
+        if self.preprocessor is not None:
+            frame = self.preprocessor.transform(frame).to_pandas()
+        return self.model.predict_proba(frame[list(self.model.feature_name_)])[:, 1]
+
+    def _predict_each(self, records):
+        # Fallback de um lote com falha: cada registro isolado, apenas o defeituoso recebe a exceção
+        results = []
+        for record in records:
+            try:
+                results.append(self._predict([record])[0])
+            except Exception as exc:
+                results.append(exc)
+        return results
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            self._last_batch_size = len(batch)
+            self.stats['requests'] += len(batch)
+            self.stats['batches'] += 1
+            self.stats['max_batch_size'] = max(self.stats['max_batch_size'], len(batch))
+
+            records = [features for features, _ in batch]
+            try:
+                scores = await loop.run_in_executor(self._executor, self._predict, records)
+            except Exception:
+                scores = await loop.run_in_executor(self._executor, self._predict_each, records)
+
+            for (_, future), score in zip(batch, scores):
+                if future.done():
+                    continue
+                if isinstance(score, Exception):
+                    future.set_exception(score)
+                    continue
+                risco, cor_risco = classify_risk(score)
+                future.set_result({
+                    'score': float(score),
+                    'aprovado': bool(score < self.threshold),
+                    'classificacao_risco': risco,
+                    'cor_risco': cor_risco
+                })
+
+async def _read_request(reader):
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+
+    method, path, _ = request_line.decode('latin-1').split(' ', 2)
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    length = int(headers.get('content-length', 0))
+    if length > MAX_BODY_BYTES:
+        return method, path, headers, None
+    body = await reader.readexactly(length) if length else b''
+    return method, path, headers, body
+
+def _write_response(writer, status, payload, keep_alive):
+    body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+    head = (
+        f"HTTP/1.1 {status} {HTTP_STATUS[status]}\r\n"
+        "Content-Type: application/json; charset=utf-8\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    writer.write(head.encode('latin-1') + body)
+
+async def _handle(batcher, method, path, body):
+    if path == '/health':
+        payload = {'status': 'ok', **batcher.stats}
+        if batcher.cache is not None:
+            payload['cache'] = batcher.cache.stats()
+        return 200, payload
+    if path != '/score':
+        return 404, {'erro': 'Rota não encontrada'}
+    if method != 'POST':
+        return 405, {'erro': 'Use POST em /score'}
+    if body is None:
+        return 413, {'erro': 'Payload muito grande'}
+
+    try:
+        features = json.loads(body)
+    except ValueError:
+        return 400, {'erro': 'JSON inválido'}
+
+    error = batcher.validate(features)
+    if error:
+        return 400, {'erro': error}
+
+    try:
+        return 200, await batcher.score(features)
+    except Exception as exc:
+        return 500, {'erro': str(exc)}
+
+async def create_server(batcher, host='127.0.0.1', port=8000):
+    """
+    Cria o servidor HTTP de escoragem (POST /score, GET /health)
+
+    Args:
+        batcher: MicroBatcher já iniciado
+        host: Interface de escuta
+        port: Porta (0 escolhe uma porta livre, útil em testes)
+
+    Returns:
+        asyncio.Server: Servidor em execução
+    """
+
+    async def handle_connection(reader, writer):
+        try:
+            while True:
+                request = await _read_request(reader)
+                if request is None:
+                    break
+                method, path, headers, body = request
+                keep_alive = headers.get('connection', '').lower() != 'close'
+
+                status, payload = await _handle(batcher, method, path, body)
+                _write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle_connection, host, port)
+
+async def serve(model, host, port, max_batch_size, max_wait_ms, preprocessor=None, cache=None,
+                model_loader=None):
+    batcher = MicroBatcher(model, max_batch_size, max_wait_ms, preprocessor=preprocessor, cache=cache,
+                           model_loader=model_loader)
+    await batcher.start()
+    server = await create_server(batcher, host, port)
+    print(f"Serviço de escoragem em http://{host}:{port}/score")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await batcher.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description="Serviço HTTP de escoragem com micro-batching")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--model-path", default=MODEL_PATH)
+    parser.add_argument("--max-batch-size", type=int, default=MAX_BATCH_SIZE)
+    parser.add_argument("--max-wait-ms", type=float, default=MAX_WAIT_MS)
+    parser.add_argument("--compiled", action="store_true",
+                        help="Usa o avaliador NumPy compilado em vez do LightGBM")
+    parser.add_argument("--preprocessor-path", default=None,
+                        help="Aceita solicitantes brutos aplicando o pipeline salvo pelo notebook")
+    parser.add_argument("--cache-size", type=int, default=MAX_ENTRIES,
+                        help="Entradas no cache de scores (0 desativa)")
+    parser.add_argument("--cache-ttl", type=float, default=TTL_SECONDS)
+    args = parser.parse_args()
+
+    if args.compiled:
+        from utils.compiled_model import load_compiled_model
+        model_loader = load_compiled_model
+    else:
+        model_loader = load_model
+    model = model_loader(args.model_path)
+
+    preprocessor = None
+    if args.preprocessor_path:
+        from utils.preprocessing import load_preprocessor
+        preprocessor = load_preprocessor(args.preprocessor_path)
+
+    cache = None
+    if args.cache_size > 0:
+        cache = ScoreCache(args.cache_size, args.cache_ttl, model_path=args.model_path)
+
+    asyncio.run(serve(model, args.host, args.port, args.max_batch_size, args.max_wait_ms,
+                      preprocessor, cache, model_loader))
+
+if __name__ == "__main__":
+    main()